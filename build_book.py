@@ -7,12 +7,31 @@ to reliably extract chapter/section structure even with numbering errors.
 """
 
 import json
+import multiprocessing
 import os
 import re
 import shutil
 import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
 from docx import Document
+from docx.table import Table
+
+try:
+    import tomllib as _tomllib  # Python 3.11+
+except ImportError:
+    try:
+        import tomli as _tomllib  # type: ignore[import-not-found]
+    except ImportError:
+        _tomllib = None
+
+try:
+    import orjson as _orjson  # Optional: faster JSON decoding
+except ImportError:
+    _orjson = None
 
 # Configuration
 DEFAULT_INPUT_DOCX = "example/sample-book.docx"
@@ -22,6 +41,77 @@ BOOK_CONFIG_FILE = "book_config.toml"
 LANG_STORE_DIR = "lang-store"
 ENABLE_MARKDOWN = True  # Enable markdown generation alongside JSON
 
+# XML namespaces and qualified tag names used when walking the document body
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_WP_NS = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+_A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_V_NS = "urn:schemas-microsoft-com:vml"
+_O_NS = "urn:schemas-microsoft-com:office:office"
+_DRAWING_TAG = f"{{{_W_NS}}}drawing"
+_PICT_TAG = f"{{{_W_NS}}}pict"
+_TAB_TAG = f"{{{_W_NS}}}tab"
+_P_TAG = f"{{{_W_NS}}}p"
+_R_TAG = f"{{{_W_NS}}}r"
+_HYPERLINK_TAG = f"{{{_W_NS}}}hyperlink"
+_TBL_TAG = f"{{{_W_NS}}}tbl"
+_FRAMEPR_PATH = f"{{{_W_NS}}}pPr/{{{_W_NS}}}framePr"
+_DOCPR_TAG = f"{{{_WP_NS}}}docPr"
+_BLIP_TAG = f"{{{_A_NS}}}blip"
+_EMBED_ATTR = f"{{{_R_NS}}}embed"
+_RID_ATTR = f"{{{_R_NS}}}id"
+_VSHAPE_TAG = f"{{{_V_NS}}}shape"
+_IMAGEDATA_TAG = f"{{{_V_NS}}}imagedata"
+_OTITLE_TAG = f"{{{_O_NS}}}title"
+_FRAME_X_ATTR = f"{{{_W_NS}}}x"
+_FRAME_Y_ATTR = f"{{{_W_NS}}}y"
+_T_TAG = f"{{{_W_NS}}}t"
+_BR_TAG = f"{{{_W_NS}}}br"
+_BR_TYPE_ATTR = f"{{{_W_NS}}}type"
+# Fixed text of the other run children CT_R.text renders; a w:br only
+# renders (as "\n") when it is a line break, not a page or column break
+_RUN_CHILD_TEXT = {
+    f"{{{_W_NS}}}cr": "\n",
+    f"{{{_W_NS}}}noBreakHyphen": "-",
+    f"{{{_W_NS}}}ptab": "\t",
+    _TAB_TAG: "\t",
+}
+_RUN_TEXT_TAGS = (_T_TAG, _BR_TAG, *_RUN_CHILD_TEXT)
+
+# Precompiled regex patterns (applied per paragraph / table cell on hot paths)
+_NUM_PREFIX_RE = re.compile(r"^\d+(\.\d+)*\s*")
+_SLUG_NONALNUM = re.compile(r"[^\w]+", re.UNICODE)
+# ASCII non-word chars -> space (equivalent to _SLUG_NONALNUM for ASCII titles)
+_SLUG_ASCII_TABLE = {
+    c: " " for c in range(128) if not (chr(c).isalnum() or chr(c) == "_")
+}
+_OCR_DIGIT_RE = re.compile(r"\b([IlO])(\d)")
+_EXCEPTION_NUM_RE = re.compile(r"^([\d.]+)")
+_TAB_PAGE_NUM_RE = re.compile(r"\t\s*\d+\s*$")
+_DOSAGE_RE = re.compile(r"\d+\.\d+\s*(mg|ml|kg|g(?!\w)|lb|%|cc)\b", re.IGNORECASE)
+_AGE_RE = re.compile(r"\d+\.\d+\s*(year|month|week|day|hour)", re.IGNORECASE)
+# Substrings one of which must appear (lowercased) for _AGE_RE to match
+_AGE_HINTS = ("year", "month", "week", "day", "hour")
+_LEADING_DECIMAL_RE = re.compile(r"^0\.\d+\s")
+_TOC_NUMBER_RE = re.compile(r"^\d+\.\s*\d+(?:\.\s*\d+)?\s*")
+_SECNUM_START_RE = re.compile(r"^\d+\.\d+")
+_NUMBERED_LINE_RE = re.compile(r"^\d+\.")
+_TOC_LINE_RE = re.compile(r"^(\d+)\.\s*(\d+)(?:\.\s*(\d+))?\s+(.+)")
+_DOT_LEADER_TAIL_RE = re.compile(r"\s*\.{2,}.*$")
+_CHAPTER_WORD_RE = re.compile(r"^Chapter\s+(\d+)\.0\s+(.+)", re.IGNORECASE)
+_CHAPTER_COLON_RE = re.compile(r"^Chapter\s+(\d+):\s+(.+)", re.IGNORECASE)
+_EMBEDDED_NUM_RE = re.compile(r"\D\.(\d+\.\d+(?:\.\d+)?)\s+([A-Z])")
+# Leading-number OCR fixes fused into one anchored match (see _ocr_fix_repl)
+_OCR_FIX_RE = re.compile(
+    r"^(?P<lead>[Il])?(?P<num>\d+)"
+    r"(?:\.(?:(?P<sec>[Il])(?:(?P<secsub>\d*\.)[Il])?|(?P<sub>\d+\.)[Il]|\s+(?=\d)))?"
+)
+# N.X or N.X.Y heading number; group 3 is None for N.X
+_HEADING_NUM_RE = re.compile(r"^(\d+)\.(\d+)(?:\.(\d+))?\s*(.*?)$")
+_HEADING_NUM_DOTALL_RE = re.compile(r"^(\d+)\.(\d+)(?:\.(\d+))?\s+(.*)", re.DOTALL)
+_CELL_SECTION_RE = re.compile(r"^\d+\.\d+(?:\.\d+)?\s+")
+_CELL_SPLIT_RE = re.compile(r"(?=^\d+\.\d+(?:\.\d+)?\s+)", re.MULTILINE)
+
 
 def _get_lang_code():
     """Get language code from LANG_CODE env var (set by Makefile)."""
@@ -61,6 +151,80 @@ def discover_lang_files(lang):
 # ============================================================================
 
 
+# Directories already created by ensure_dir during this run
+_ensured_dirs = set()
+
+
+def ensure_dir(path):
+    """Create a directory once per run, skipping the makedirs stat afterwards."""
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+
+def remove_trees(paths):
+    """Delete directory trees concurrently, skipping any that do not exist."""
+    paths = [path for path in paths if os.path.exists(path)]
+    if len(paths) < 2:
+        for path in paths:
+            shutil.rmtree(path)
+        return
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        list(executor.map(shutil.rmtree, paths))
+
+
+@lru_cache(maxsize=4)
+def open_document(docx_path):
+    """Open a DOCX once per run; config loading and the build share the parse."""
+    return Document(docx_path)
+
+
+# Flags for write_bytes (binary data such as images); O_BINARY only exists
+# (and matters) on Windows
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def write_bytes(path, payload):
+    """Write payload to path through a raw descriptor, normally in one syscall."""
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def write_text(path, text):
+    """Write text to path as UTF-8 in text mode with a single write call."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_json(path, data):
+    """Write data as json.dump(data, f, indent=2) would, with a single write call."""
+    write_text(path, json.dumps(data, indent=2))
+
+
+def decode_json(payload):
+    """Decode UTF-8 JSON bytes, with orjson when installed.
+
+    Decode errors raise json.JSONDecodeError either way (orjson's error
+    subclasses it).
+    """
+    if _orjson is not None:
+        return _orjson.loads(payload)
+    return json.loads(payload.decode("utf-8"))
+
+
+def read_json(path):
+    """Read a UTF-8 JSON file (see decode_json)."""
+    with open(path, "rb") as f:
+        return decode_json(f.read())
+
+
+@lru_cache(maxsize=4096)
 def slugify(text):
     """Convert text to URL-friendly slug.
 
@@ -69,15 +233,23 @@ def slugify(text):
     if not text:
         return "untitled"
     # Remove number prefix (e.g., "1.1 " or "1.0 " or "1.3.2 ")
-    text = re.sub(r"^\d+(\.\d+)*\s*", "", text)
+    text = _NUM_PREFIX_RE.sub("", text)
     # Convert to lowercase, replace non-word chars with underscores
     # Supports Unicode letters (Cyrillic, etc.) via \w character class
     text = text.lower().strip()
-    text = re.sub(r"[^\w]+", "_", text, flags=re.UNICODE)
+    if text.isalnum():
+        # Already clean: single word, nothing to replace or strip
+        return text
+    if text.isascii():
+        # ASCII fast path: map non-word chars to spaces, collapse runs via split
+        text = "_".join(text.translate(_SLUG_ASCII_TABLE).split())
+    else:
+        text = _SLUG_NONALNUM.sub("_", text)
     text = text.strip("_")
     return text if text else "untitled"
 
 
+@lru_cache(maxsize=4096)
 def clean_title(title):
     """Remove number prefix from title.
 
@@ -86,7 +258,7 @@ def clean_title(title):
     if not title:
         return "Untitled"
     # Remove patterns like "1.0 ", "1.1 ", "1.3.2 "
-    cleaned = re.sub(r"^\d+(\.\d+)*\s*", "", title).strip()
+    cleaned = _NUM_PREFIX_RE.sub("", title).strip()
     return cleaned if cleaned else "Untitled"
 
 
@@ -117,13 +289,9 @@ def resolve_paths_from_config(lang=None):
         docx_path, exceptions_path = discover_lang_files(lang)
         # Allow per-lang config to override auto-discovered paths
         lang_config_file = os.path.join(LANG_STORE_DIR, lang, BOOK_CONFIG_FILE)
-        if os.path.exists(lang_config_file):
-            try:
-                import tomllib
-            except ImportError:
-                import tomli as tomllib  # type: ignore[import-not-found]
+        if os.path.exists(lang_config_file) and _tomllib is not None:
             with open(lang_config_file, "rb") as f:
-                lc = tomllib.load(f)
+                lc = _tomllib.load(f)
             if lc.get("original_book_file"):
                 docx_path = lc["original_book_file"]
             if lc.get("exceptions_file"):
@@ -135,17 +303,12 @@ def resolve_paths_from_config(lang=None):
     exceptions_file = DEFAULT_EXCEPTIONS_FILE
 
     if os.path.exists(BOOK_CONFIG_FILE):
-        try:
-            import tomllib  # Python 3.11+
-        except ImportError:
-            try:
-                import tomli as tomllib  # type: ignore[import-not-found]
-            except ImportError:
-                return input_docx, exceptions_file
+        if _tomllib is None:
+            return input_docx, exceptions_file
 
         try:
             with open(BOOK_CONFIG_FILE, "rb") as f:
-                file_config = tomllib.load(f)
+                file_config = _tomllib.load(f)
             if file_config.get("original_book_file"):
                 input_docx = file_config["original_book_file"]
             if file_config.get("exceptions_file"):
@@ -183,27 +346,16 @@ def load_book_config(docx_path, lang=None):
 
     if os.path.exists(config_file):
         print(f"Loading configuration from {config_file}...")
-        try:
-            import tomllib  # Python 3.11+
-
-            with open(config_file, "rb") as f:
-                file_config = tomllib.load(f)
-                config.update(file_config)
-            print(f"✓ Loaded configuration from {config_file}")
-        except ImportError:
+        if _tomllib is None:
+            print("Warning: Could not load TOML (need Python 3.11+ or tomli package)")
+        else:
             try:
-                import tomli as tomllib  # type: ignore[import-not-found]
-
                 with open(config_file, "rb") as f:
-                    file_config = tomllib.load(f)
+                    file_config = _tomllib.load(f)
                     config.update(file_config)
                 print(f"✓ Loaded configuration from {config_file}")
-            except ImportError:
-                print(
-                    "Warning: Could not load TOML (need Python 3.11+ or tomli package)"
-                )
-        except Exception as e:
-            print(f"Warning: Could not load {config_file}: {e}")
+            except Exception as e:
+                print(f"Warning: Could not load {config_file}: {e}")
     else:
         print(f"No {config_file} found, using DOCX metadata fallback...")
 
@@ -213,7 +365,7 @@ def load_book_config(docx_path, lang=None):
 
     # Fallback to DOCX metadata for missing fields
     try:
-        doc = Document(docx_path)
+        doc = open_document(docx_path)
 
         # Try DOCX core properties first
         if not config["title"] and doc.core_properties.title:
@@ -222,7 +374,7 @@ def load_book_config(docx_path, lang=None):
 
         # If still no title, use first non-empty paragraph as title
         if not config["title"]:
-            for para in doc.paragraphs[:10]:  # Check first 10 paragraphs
+            for para in _cached_paragraphs(doc)[:10]:  # Check first 10 paragraphs
                 text = para.text.strip()
                 if text and len(text) > 3 and not text.startswith("by "):
                     config["title"] = text
@@ -259,33 +411,46 @@ def create_book_toml(config, output_dir):
         lines.append(f'original_language = "{config["original_language"]}"')
 
     toml_path = os.path.join(output_dir, "_book.toml")
-    with open(toml_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
+    write_text(toml_path, "\n".join(lines) + "\n")
     print(f"✓ Created {toml_path}")
 
 
-def build_document_order(chapters, title_map):
+# One navigable unit (chapter intro, section or subsection) in reading order
+DocOrderEntry = namedtuple(
+    "DocOrderEntry",
+    "chapter_num section_num subsection_num title dir_name file_name "
+    "chapter_slug section_slug subsection_slug",
+)
+
+
+def build_document_order(chapters, chapter_titles, section_titles, subsection_titles):
     """Build ordered list of all sections for prev/next linking.
 
-    Returns list of tuples:
+    Titles missing from the TOC maps fall back to "Chapter N" or the
+    dotted number, so each entry carries its final title.
+
+    Returns list of DocOrderEntry tuples:
         (chapter_num, section_num, subsection_num, title, dir_name, file_name,
          chapter_slug, section_slug, subsection_slug)
     """
     order = []
 
+    # Keys must be sorted: chapters fill in document order, which can differ
+    # from numeric order after exceptions or out-of-sequence headings
     for chapter_num in sorted(chapters.keys()):
         chapter_data = chapters[chapter_num]
 
         # Get chapter title for directory name
-        chapter_key = (chapter_num, "chapter")
-        chapter_title = title_map.get(chapter_key, f"Chapter {chapter_num}")
+        chapter_title = chapter_titles.get(chapter_num)
+        if chapter_title is None:
+            chapter_title = f"Chapter {chapter_num}"
         chapter_slug = slugify(chapter_title)
         chapter_dir_name = f"{chapter_num:02d}"
 
         # Add intro (section 0)
         intro_title = chapter_title
         order.append(
-            (
+            DocOrderEntry(
                 chapter_num,
                 0,
                 None,
@@ -300,13 +465,14 @@ def build_document_order(chapters, title_map):
 
         # Add sections
         for section_num in sorted(chapter_data["sections"].keys()):
-            section_key = (chapter_num, section_num)
-            section_title = title_map.get(section_key, f"{chapter_num}.{section_num}")
+            section_title = section_titles.get((chapter_num, section_num))
+            if section_title is None:
+                section_title = f"{chapter_num}.{section_num}"
             section_slug = slugify(section_title)
             section_file_name = f"{section_num:02d}"
 
             order.append(
-                (
+                DocOrderEntry(
                     chapter_num,
                     section_num,
                     None,
@@ -322,18 +488,18 @@ def build_document_order(chapters, title_map):
             # Add subsections
             section_data = chapter_data["sections"][section_num]
             for subsection_num in sorted(section_data["subsections"].keys()):
-                subsection_key = (chapter_num, section_num, subsection_num)
-                subsection_title = title_map.get(
-                    subsection_key,
-                    f"{chapter_num}.{section_num}.{subsection_num}",
+                subsection_title = subsection_titles.get(
+                    (chapter_num, section_num, subsection_num)
                 )
+                if subsection_title is None:
+                    subsection_title = f"{chapter_num}.{section_num}.{subsection_num}"
                 subsection_slug = slugify(subsection_title)
                 subsection_file_name = (
                     f"{section_num:02d}_{subsection_num:02d}"
                 )
 
                 order.append(
-                    (
+                    DocOrderEntry(
                         chapter_num,
                         section_num,
                         subsection_num,
@@ -372,15 +538,20 @@ def build_section_json(
 
 
 # Import functions from test_first_error.py
+@lru_cache(maxsize=4096)
 def normalize_for_comparison(text):
     """Normalize text for comparison - lowercase, common OCR fixes."""
     if not text:
         return ""
     text = text.lower()
-    text = re.sub(r"\b[Il](\d)", r"1\1", text)
-    text = re.sub(r"\b[O](\d)", r"0\1", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    text = _OCR_DIGIT_RE.sub(_ocr_digit_repl, text)
+    # Collapse whitespace runs and trim (str.split uses the same set as \s)
+    return " ".join(text.split())
+
+
+def _ocr_digit_repl(match):
+    """Map an OCR'd letter before a digit to its digit: I/l -> 1, O -> 0."""
+    return ("0" if match.group(1) == "O" else "1") + match.group(2)
 
 
 def load_exceptions(exceptions_file="conf/exceptions.conf"):
@@ -398,8 +569,8 @@ def load_exceptions(exceptions_file="conf/exceptions.conf"):
                     wrong_part, correct_part = line.split("=", 1)
                     wrong_part = wrong_part.strip()
                     correct_part = correct_part.strip()
-                    wrong_match = re.match(r"^([\d.]+)", wrong_part)
-                    correct_match = re.match(r"^([\d.]+)", correct_part)
+                    wrong_match = _EXCEPTION_NUM_RE.match(wrong_part)
+                    correct_match = _EXCEPTION_NUM_RE.match(correct_part)
                     if wrong_match and correct_match:
                         wrong_num = wrong_match.group(1)
                         correct_num = correct_match.group(1)
@@ -409,30 +580,68 @@ def load_exceptions(exceptions_file="conf/exceptions.conf"):
     return exceptions
 
 
+def _strip_page_number(text, leader):
+    """Remove a trailing page number after a dot leader (".") or tab ("\\t") leader."""
+    end = len(text)
+    while end and text[end - 1].isspace():
+        end -= 1
+    start = end
+    while start and text[start - 1].isdecimal():
+        start -= 1
+    if start == end:
+        return text
+
+    if leader == ".":
+        while start and text[start - 1].isspace():
+            start -= 1
+        dots_end = start
+        while start and text[start - 1] == ".":
+            start -= 1
+        if dots_end - start < 2:
+            return text
+        while start and text[start - 1].isspace():
+            start -= 1
+        return text[:start]
+
+    # Tab leader: the whitespace run before the number must contain a tab
+    has_tab = False
+    while start and text[start - 1].isspace():
+        start -= 1
+        if text[start] == "\t":
+            has_tab = True
+    return text[:start] if has_tab else text
+
+
 def normalize_toc_text(text):
     """Normalize text for TOC parsing."""
     if not text:
         return ""
     # Remove page numbers and dots (dot leaders or tab-separated)
-    text = re.sub(r"\s*\.{2,}\s*\d+\s*$", "", text)
-    text = re.sub(r"\s*\t+\s*\d+\s*$", "", text)
+    text = _strip_page_number(text, ".")
+    text = _strip_page_number(text, "\t")
     # Clean up whitespace
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return " ".join(text.split())
+
 
+def is_toc_false_positive(
+    text, entry_type, chapter, section=None, subsection=None, title=None
+):
+    """Check if this is a false positive (not an actual TOC entry).
 
-def is_toc_false_positive(text, entry_type, chapter, section=None, subsection=None):
-    """Check if this is a false positive (not an actual TOC entry)."""
+    title, if given, is text with its section number already stripped.
+    """
     # Filter out dosage patterns like "0.2 mg/kg" - must have unit immediately after number
-    if re.search(r"\d+\.\d+\s*(mg|ml|kg|g(?!\w)|lb|%|cc)\b", text, re.IGNORECASE):
+    if _DOSAGE_RE.search(text):
         return True
 
-    # Filter out age patterns like "1.5 years"
-    if re.search(r"\d+\.\d+\s*(year|month|week|day|hour)", text, re.IGNORECASE):
+    # Filter out age patterns like "1.5 years"; a cheap substring pre-check
+    # lets most titles skip the regex
+    lowered = text.lower()
+    if any(h in lowered for h in _AGE_HINTS) and _AGE_RE.search(text):
         return True
 
     # Filter out decimal numbers in context like "0.5 pour-on"
-    if re.match(r"^0\.\d+\s", text):
+    if _LEADING_DECIMAL_RE.match(text):
         return True
 
     # Chapter 0 is likely false positives
@@ -441,7 +650,10 @@ def is_toc_false_positive(text, entry_type, chapter, section=None, subsection=No
 
     # Section titles should have substantial text after the number
     # Handle extra spaces in numbering like "3. 1" or "21. 2"
-    text_after_number = re.sub(r"^\d+\.\s*\d+(?:\.\s*\d+)?\s*", "", text)
+    if title is None:
+        text_after_number = _TOC_NUMBER_RE.sub("", text)
+    else:
+        text_after_number = title
     if len(text_after_number) < 3:
         return True
 
@@ -456,29 +668,144 @@ def is_toc_false_positive(text, entry_type, chapter, section=None, subsection=No
     return False
 
 
-def extract_toc_from_document(doc):
-    """Extract TOC entries directly from the document."""
+def _cached_paragraphs(doc):
+    """Return doc.paragraphs, building the list only once per document."""
+    if not hasattr(doc, "_cached_paragraphs"):
+        doc._cached_paragraphs = doc.paragraphs
+    return doc._cached_paragraphs
+
+
+# (document part, pStyle id) -> style name
+_style_names = {}
+
+
+def paragraph_style_name(para):
+    """Return the paragraph's style name, or "" if it has no style."""
+    key = (para.part, para._p.style)
+    name = _style_names.get(key)
+    if name is None:
+        style = para.style
+        name = _style_names[key] = style.name if style else ""
+    return name
+
+
+def run_text(r):
+    """Return a <w:r>'s text, the same string as CT_R.text."""
+    parts = []
+    for e in r.iterchildren(*_RUN_TEXT_TAGS):
+        tag = e.tag
+        if tag == _T_TAG:
+            parts.append(e.text or "")
+        elif tag == _BR_TAG:
+            if e.get(_BR_TYPE_ATTR, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_CHILD_TEXT[tag])
+    return "".join(parts)
+
+
+def paragraph_xml_text(p):
+    """Return a <w:p>'s text, the same string as Paragraph.text (see run_text)."""
+    parts = []
+    for child in p.iterchildren(_R_TAG, _HYPERLINK_TAG):
+        if child.tag == _R_TAG:
+            parts.append(run_text(child))
+        else:
+            parts.extend([run_text(r) for r in child.iterchildren(_R_TAG)])
+    return "".join(parts)
+
+
+def _cached_paragraph_texts(doc):
+    """Return stripped paragraph texts, computed once per document."""
+    if not hasattr(doc, "_cached_paragraph_texts"):
+        doc._cached_paragraph_texts = tuple(
+            paragraph_xml_text(p._p).strip() for p in _cached_paragraphs(doc)
+        )
+    return doc._cached_paragraph_texts
+
+
+def _cached_paragraph_text_map(doc):
+    """Return {id(paragraph): stripped text} for the cached paragraph proxies."""
+    if not hasattr(doc, "_cached_paragraph_text_map"):
+        doc._cached_paragraph_text_map = dict(
+            zip(map(id, _cached_paragraphs(doc)), _cached_paragraph_texts(doc))
+        )
+    return doc._cached_paragraph_text_map
+
+
+# A numbered TOC line; section is 0 for chapters, subsection None unless N.X.Y
+TocEntry = namedtuple("TocEntry", "type chapter section subsection title")
+
+# TocEntry plus the normalized forms used when matching headings to the TOC
+ExpectedTocEntry = namedtuple(
+    "ExpectedTocEntry", TocEntry._fields + ("title_normalized", "title_only")
+)
+
+
+def extract_toc_and_end(doc):
+    """Extract TOC entries and find where the TOC ends in a single pass.
+
+    Returns (toc_entries, toc_end_index). The entry scan and the end search
+    keep their own stop conditions; the result is cached on the document.
+    """
+    if hasattr(doc, "_toc_and_end"):
+        return doc._toc_and_end
+
     toc_entries = []
     in_toc = False
     consecutive_non_toc = 0
+    entries_done = False
 
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    toc_end = 0
+    end_in_toc = False
+    end_non_toc = 0
+    end_done = False
+
+    for i, text in enumerate(_cached_paragraph_texts(doc)):
+        if entries_done and end_done:
+            break
+
+        # One substring search serves the end scan, the leader test and the
+        # "..." stop test below
+        five_dots = "....." in text
+
+        # TOC end: last dot-leader line before 50+ non-TOC paragraphs
+        if not end_done:
+            if five_dots:
+                end_in_toc = True
+                toc_end = i
+                end_non_toc = 0
+            elif end_in_toc and text:
+                end_non_toc += 1
+                if end_non_toc > 50:
+                    end_done = True
+
+        if entries_done:
+            continue
 
         # Detect TOC section (entries with dots or tabs leading to page numbers)
-        has_dot_leaders = "....." in text or "....." in text.replace(" ", "")
-        has_tab_page_num = "\t" in text and re.search(r"\t\s*\d+\s*$", text)
+        # Spaced leaders (". . . . .") need the replace; five dots must exist first
+        has_dot_leaders = five_dots or (
+            text.count(".") >= 5 and "....." in text.replace(" ", "")
+        )
+        has_tab_page_num = "\t" in text and _TAB_PAGE_NUM_RE.search(text)
         if has_dot_leaders or has_tab_page_num:
             in_toc = True
             consecutive_non_toc = 0
 
         # Stop when we hit substantial content after TOC
-        if in_toc and text and not "..." in text and not has_tab_page_num:
+        if (
+            in_toc
+            and text
+            and not five_dots
+            and "..." not in text
+            and not has_tab_page_num
+        ):
             # Check if this looks like a TOC entry without dots
-            if not re.match(r"^\d+\.\d+", text):
+            if not _SECNUM_START_RE.match(text):
                 consecutive_non_toc += 1
                 if consecutive_non_toc > 50:
-                    break
+                    entries_done = True
                 continue
             else:
                 consecutive_non_toc = 0
@@ -487,62 +814,66 @@ def extract_toc_from_document(doc):
             # Extract TOC entry
             normalized = normalize_toc_text(text)
 
-            # Match chapter pattern (N.0) - handle extra spaces
-            chapter_match = re.match(r"^(\d+)\.\s*0\s+(.+)", normalized)
-            if chapter_match:
-                chapter = int(chapter_match.group(1))
-                if not is_toc_false_positive(normalized, "chapter", chapter):
-                    toc_entries.append(
-                        {
-                            "type": "chapter",
-                            "chapter": chapter,
-                            "section": 0,
-                            "subsection": None,
-                            "title": normalized,
-                        }
-                    )
+            # One match classifies N.0 (chapter), N.X (section), N.X.Y (subsection)
+            # - handles extra spaces
+            toc_match = _TOC_LINE_RE.match(normalized)
+            if not toc_match:
                 continue
-
-            # Match section pattern (N.X where X > 0) - handle extra spaces
-            section_match = re.match(r"^(\d+)\.\s*(\d+)\s+(.+)", normalized)
-            if section_match and int(section_match.group(2)) > 0:
-                chapter = int(section_match.group(1))
-                section = int(section_match.group(2))
-                if not is_toc_false_positive(normalized, "section", chapter, section):
-                    toc_entries.append(
-                        {
-                            "type": "section",
-                            "chapter": chapter,
-                            "section": section,
-                            "subsection": None,
-                            "title": normalized,
-                        }
-                    )
+            chapter = int(toc_match.group(1))
+            if toc_match.group(3) is not None:
+                entry_type = "subsection"
+                section = int(toc_match.group(2))
+                subsection = int(toc_match.group(3))
+            elif toc_match.group(2) == "0":
+                entry_type = "chapter"
+                section = 0
+                subsection = None
+            elif int(toc_match.group(2)) > 0:
+                entry_type = "section"
+                section = int(toc_match.group(2))
+                subsection = None
+            else:
                 continue
 
-            # Match subsection pattern (N.X.Y) - handle extra spaces
-            subsection_match = re.match(
-                r"^(\d+)\.\s*(\d+)\.\s*(\d+)\s+(.+)", normalized
-            )
-            if subsection_match:
-                chapter = int(subsection_match.group(1))
-                section = int(subsection_match.group(2))
-                subsection = int(subsection_match.group(3))
-                if not is_toc_false_positive(
-                    normalized, "subsection", chapter, section, subsection
-                ):
-                    toc_entries.append(
-                        {
-                            "type": "subsection",
-                            "chapter": chapter,
-                            "section": section,
-                            "subsection": subsection,
-                            "title": normalized,
-                        }
-                    )
-                continue
+            # _TOC_LINE_RE's title group is exactly what _TOC_NUMBER_RE leaves
+            if not is_toc_false_positive(
+                normalized,
+                entry_type,
+                chapter,
+                section,
+                subsection,
+                toc_match.group(4),
+            ):
+                toc_entries.append(
+                    TocEntry(entry_type, chapter, section, subsection, normalized)
+                )
+
+    doc._toc_and_end = (toc_entries, toc_end)
+    return doc._toc_and_end
 
-    return toc_entries
+
+def strip_section_number(text):
+    """Strip a leading "N.X" or "N.X.Y" number and following whitespace."""
+    n = len(text)
+    i = 0
+    while i < n and text[i].isdecimal():
+        i += 1
+    if i == 0 or i == n or text[i] != ".":
+        return text
+    j = i + 1
+    while j < n and text[j].isdecimal():
+        j += 1
+    if j == i + 1:
+        return text
+    if j < n and text[j] == ".":
+        k = j + 1
+        while k < n and text[k].isdecimal():
+            k += 1
+        if k > j + 1:
+            j = k
+    while j < n and text[j].isspace():
+        j += 1
+    return text[j:]
 
 
 def build_toc_structure(toc_entries):
@@ -550,62 +881,81 @@ def build_toc_structure(toc_entries):
     expected_sequence = []
 
     for entry in toc_entries:
+        title_normalized = normalize_for_comparison(entry.title)
         expected_sequence.append(
-            {
-                "type": entry["type"],
-                "chapter": entry["chapter"],
-                "section": entry.get("section", 0),
-                "subsection": entry.get("subsection"),
-                "title": entry["title"],
-                "title_normalized": normalize_for_comparison(entry["title"]),
-            }
+            ExpectedTocEntry(
+                *entry,
+                title_normalized,
+                # Title without its number, used by every title comparison
+                strip_section_number(title_normalized),
+            )
         )
 
     return expected_sequence
 
 
-def extract_number_and_title(text, doc, para_index):
-    """Extract section number and title from text."""
+def _ocr_fix_repl(match):
+    """Rebuild a leading section number with OCR errors corrected.
+
+    Equivalent to applying, in order: "I2" -> "12", "3.l" -> "3.1",
+    "3.1.l" -> "3.1.1" and "3. 1" -> "3.1".
+    """
+    number = match.group("num")
+    if match.group("lead") is not None:
+        number = "1" + number
+    if match.end("num") == match.end():
+        return number
+    if match.group("sec") is not None:
+        number += ".1"
+        if match.group("secsub") is not None:
+            number += match.group("secsub") + "1"
+    elif match.group("sub") is not None:
+        number += "." + match.group("sub") + "1"
+    else:
+        number += "."
+    return number
+
+
+def extract_number_and_title(text, paragraph_texts, para_index):
+    """Extract section number and title from text.
+
+    paragraph_texts is the document's stripped paragraph texts (see
+    _cached_paragraph_texts), used to join continuation lines that follow
+    para_index. Pass None for text without surrounding paragraphs.
+    """
     if not text:
         return None
 
-    text = re.sub(r"\s*\.{2,}.*$", "", text).strip()
+    text = _DOT_LEADER_TAIL_RE.sub("", text).strip()
 
     # Handle "Chapter N.0" or "Chapter N:" patterns
-    chapter_match = re.match(r"^Chapter\s+(\d+)\.0\s+(.+)", text, re.IGNORECASE)
+    chapter_match = _CHAPTER_WORD_RE.match(text)
     if chapter_match:
         text = chapter_match.group(1) + ".0 " + chapter_match.group(2)
     else:
-        chapter_colon_match = re.match(r"^Chapter\s+(\d+):\s+(.+)", text, re.IGNORECASE)
+        chapter_colon_match = _CHAPTER_COLON_RE.match(text)
         if chapter_colon_match:
             text = chapter_colon_match.group(1) + ".0 " + chapter_colon_match.group(2)
 
     # Check for embedded section number
-    embedded_match = re.search(r"\D\.(\d+\.\d+(?:\.\d+)?)\s+([A-Z])", text)
+    embedded_match = _EMBEDDED_NUM_RE.search(text)
     if embedded_match:
         start_pos = embedded_match.start(1)
         text = text[start_pos:]
 
     # Fix common OCR errors
-    text = re.sub(r"^[Il](\d)", r"1\1", text)
-    text = re.sub(r"^(\d+)\.[Il]", r"\1.1", text)
-    text = re.sub(r"^(\d+)\.(\d+)\.[Il]", r"\1.\2.1", text)
-    text = re.sub(r"^(\d+)\.\s+(\d+)", r"\1.\2", text)
+    text = _OCR_FIX_RE.sub(_ocr_fix_repl, text, count=1)
 
     # Look ahead for continuation lines
     combined_text = text
     use_dotall = False
 
-    if doc and para_index is not None:
-        # Cache paragraphs list to avoid rebuilding it on every access
-        if not hasattr(doc, "_cached_paragraphs"):
-            doc._cached_paragraphs = doc.paragraphs
-        paras = doc._cached_paragraphs
+    if paragraph_texts is not None and para_index is not None:
         for offset in range(1, 6):
             next_idx = para_index + offset
-            if next_idx < len(paras):
-                next_text = paras[next_idx].text.strip()
-                if next_text and not re.match(r"^\d+\.", next_text):
+            if next_idx < len(paragraph_texts):
+                next_text = paragraph_texts[next_idx]
+                if next_text and not _NUMBERED_LINE_RE.match(next_text):
                     combined_text += " " + next_text
                 else:
                     break
@@ -614,148 +964,151 @@ def extract_number_and_title(text, doc, para_index):
     else:
         use_dotall = True
 
-    # Try N.X.Y pattern (subsection)
+    # Match N.X.Y (subsection) or N.X (chapter/section) in one pass
     if use_dotall:
-        match = re.match(r"^(\d+)\.(\d+)\.(\d+)\s+(.*)", combined_text, re.DOTALL)
+        match = _HEADING_NUM_DOTALL_RE.match(combined_text)
     else:
-        match = re.match(r"^(\d+)\.(\d+)\.(\d+)\s*(.*?)$", combined_text)
-
-    if match:
-        return (
-            int(match.group(1)),
-            int(match.group(2)),
-            int(match.group(3)),
-            combined_text,
-        )
+        match = _HEADING_NUM_RE.match(combined_text)
 
-    # Try N.X pattern
-    if use_dotall:
-        match = re.match(r"^(\d+)\.(\d+)\s+(.*)", combined_text, re.DOTALL)
-    else:
-        match = re.match(r"^(\d+)\.(\d+)\s*(.*?)$", combined_text)
-
-    if match:
-        chapter = int(match.group(1))
-        section = int(match.group(2))
-        if section == 0:
-            return (chapter, 0, None, combined_text)
-        else:
-            return (chapter, section, None, combined_text)
+    if not match:
+        return None
 
-    return None
+    chapter = int(match.group(1))
+    section = int(match.group(2))
+    if match.group(3) is not None:
+        return (chapter, section, int(match.group(3)), combined_text)
+    return (chapter, section, None, combined_text)
 
 
 def extract_toc_structure(doc):
     """Extract TOC structure directly from document."""
     print("Extracting TOC from document...")
-    toc_entries = extract_toc_from_document(doc)
+    toc_entries, _ = extract_toc_and_end(doc)
     print(f"  Found {len(toc_entries)} TOC entries")
 
     expected_sequence = build_toc_structure(toc_entries)
     return expected_sequence
 
 
-def find_toc_end(doc):
-    """Find where TOC ends in document."""
-    toc_end = 0
-    in_toc = False
-    consecutive_non_toc = 0
+# Records yielded by get_document_elements_in_order; ``type`` is a class-level
+# tag so dispatch reads the same as the element lists built from them
+class ParagraphElem(namedtuple("ParagraphElem", "index text doc element")):
+    __slots__ = ()
+    type = "paragraph"
 
-    for i, para in enumerate(doc.paragraphs):
-        text = para.text.strip()
-        if text and "....." in text:
-            in_toc = True
-            toc_end = i
-            consecutive_non_toc = 0
-        elif in_toc and text:
-            consecutive_non_toc += 1
-            if consecutive_non_toc > 50:
-                break
 
-    return toc_end
+class TableCellElem(namedtuple("TableCellElem", "index text element")):
+    __slots__ = ()
+    type = "table_cell"
+
+
+class TableElem(namedtuple("TableElem", "index element")):
+    __slots__ = ()
+    type = "table"
+
+
+class ImageElem(
+    namedtuple(
+        "ImageElem",
+        "index image_part rId content_type para_index alt caption "
+        "frame_positioned frame_x frame_y",
+        defaults=(False, 0, 0),
+    )
+):
+    __slots__ = ()
+    type = "image"
 
 
 def get_document_elements_in_order(doc, toc_end_index):
     """Yield document elements (paragraphs, tables, and images) in document order."""
-    para_map = {id(p._element): (i, p) for i, p in enumerate(doc.paragraphs)}
-    table_map = {id(t._element): (i, t) for i, t in enumerate(doc.tables)}
+    # Body children come in the same order as doc.paragraphs / doc.tables,
+    # so two cursors map each <w:p> / <w:tbl> to its index without a lookup.
+    # Paragraph proxies are already cached for the TOC scan; tables are
+    # wrapped on demand instead of materializing doc.tables up front.
+    paragraphs = _cached_paragraphs(doc)
+    paragraph_texts = _cached_paragraph_texts(doc)
+    body = doc._body
+    para_index = -1
+    table_index = -1
 
     # Track image counter
     image_counter = 0
 
-    # XML namespaces
-    w_ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-    wp_ns = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
-    a_ns = "http://schemas.openxmlformats.org/drawingml/2006/main"
-    r_ns = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
-    v_ns = "urn:schemas-microsoft-com:vml"
-    o_ns = "urn:schemas-microsoft-com:office:office"
-
     def _extract_images_from_element(element, para_index):
         """Extract images from both w:drawing and w:pict elements."""
         nonlocal image_counter
         images = []
 
+        # One walk finds both kinds; most paragraphs contain neither.
+        # Drawings are still numbered before VML images, as before.
+        drawings = []
+        picts = []
+        for node in element.iter(_DRAWING_TAG, _PICT_TAG):
+            if node.tag == _DRAWING_TAG:
+                drawings.append(node)
+            else:
+                picts.append(node)
+
         # Method 1: Modern drawings (w:drawing > a:blip)
-        for drawing in element.findall(f".//{{{w_ns}}}drawing"):
+        for drawing in drawings:
             alt_text = ""
             title_text = ""
-            for docPr in drawing.findall(f".//{{{wp_ns}}}docPr"):
-                alt_text = docPr.get("descr", "")
-                title_text = docPr.get("title", "")
-                break
-
-            for blip in drawing.findall(f".//{{{a_ns}}}blip"):
-                embed_key = f"{{{r_ns}}}embed"
-                if embed_key in blip.attrib:
-                    rId = blip.attrib[embed_key]
+            seen_docpr = False
+            # Single walk per drawing: wp:docPr precedes the a:blip(s) it describes
+            for node in drawing.iter(_DOCPR_TAG, _BLIP_TAG):
+                if node.tag == _DOCPR_TAG:
+                    if not seen_docpr:
+                        alt_text = node.get("descr", "")
+                        title_text = node.get("title", "")
+                        seen_docpr = True
+                    continue
+                rId = node.get(_EMBED_ATTR)
+                if rId is not None:
                     try:
                         image_part = doc.part.related_parts[rId]
                         image_counter += 1
                         images.append(
-                            {
-                                "type": "image",
-                                "index": image_counter,
-                                "image_part": image_part,
-                                "rId": rId,
-                                "content_type": image_part.content_type,
-                                "para_index": para_index,
-                                "alt": alt_text,
-                                "caption": title_text,
-                            }
+                            ImageElem(
+                                image_counter,
+                                image_part,
+                                rId,
+                                image_part.content_type,
+                                para_index,
+                                alt_text,
+                                title_text,
+                            )
                         )
                     except KeyError:
                         pass
 
         # Method 2: Legacy VML images (w:pict > v:imagedata)
-        for pict in element.findall(f".//{{{w_ns}}}pict"):
+        for pict in picts:
             alt_text = ""
             # Check v:shape for alt text
-            for shape in pict.findall(f".//{{{v_ns}}}shape"):
+            for shape in pict.iter(_VSHAPE_TAG):
                 alt_text = shape.get("alt", "")
                 # Also check o:title
-                for title_elem in shape.findall(f".//{{{o_ns}}}title"):
+                for title_elem in shape.iter(_OTITLE_TAG):
                     if title_elem.text:
                         alt_text = title_elem.text
                         break
 
-            for imagedata in pict.findall(f".//{{{v_ns}}}imagedata"):
-                rId = imagedata.get(f"{{{r_ns}}}id")
+            for imagedata in pict.iter(_IMAGEDATA_TAG):
+                rId = imagedata.get(_RID_ATTR)
                 if rId:
                     try:
                         image_part = doc.part.related_parts[rId]
                         image_counter += 1
                         images.append(
-                            {
-                                "type": "image",
-                                "index": image_counter,
-                                "image_part": image_part,
-                                "rId": rId,
-                                "content_type": image_part.content_type,
-                                "para_index": para_index,
-                                "alt": alt_text,
-                                "caption": "",
-                            }
+                            ImageElem(
+                                image_counter,
+                                image_part,
+                                rId,
+                                image_part.content_type,
+                                para_index,
+                                alt_text,
+                                "",
+                            )
                         )
                     except KeyError:
                         pass
@@ -763,108 +1116,78 @@ def get_document_elements_in_order(doc, toc_end_index):
         return images
 
     for element in doc.element.body:
-        tag = element.tag.split("}")[-1] if "}" in element.tag else element.tag
-
-        if tag == "p":
-            if id(element) in para_map:
-                para_index, para = para_map[id(element)]
-                if para_index > toc_end_index:
-                    text = para.text.strip()
-
-                    # Extract images from this paragraph (both drawing and pict)
-                    images = _extract_images_from_element(element, para_index)
-
-                    # Check if paragraph uses frame positioning (w:framePr)
-                    if images:
-                        frame_pr = element.find(f"{{{w_ns}}}pPr/{{{w_ns}}}framePr")
-                        if frame_pr is not None:
-                            # Extract coordinates (try both namespaced and plain attrs)
-                            fx = frame_pr.get(f"{{{w_ns}}}x") or frame_pr.get("x", "0")
-                            fy = frame_pr.get(f"{{{w_ns}}}y") or frame_pr.get("y", "0")
-                            for img in images:
-                                img["frame_positioned"] = True
-                                img["frame_x"] = (
-                                    int(fx) if fx.lstrip("-").isdigit() else 0
-                                )
-                                img["frame_y"] = (
-                                    int(fy) if fy.lstrip("-").isdigit() else 0
-                                )
-
-                    for img in images:
-                        yield img
-
-                    if text:
-                        yield {
-                            "type": "paragraph",
-                            "index": para_index,
-                            "text": text,
-                            "doc": doc,
-                            "element": para,
-                        }
-
-        elif tag == "tbl":
-            if id(element) in table_map:
-                table_index, table = table_map[id(element)]
-
-                # Check if table contains section headers in cells
-                # Use more strict pattern - must start with section number pattern
-                has_headers = False
-                for row in table.rows:
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()
-                        # Must start with section pattern like "3.1 " or "24.1.6 "
-                        if cell_text and re.match(r"^\d+\.\d+(?:\.\d+)?\s+", cell_text):
-                            has_headers = True
-                            break
-                    if has_headers:
-                        break
+        # Compare the full qualified tag; no local-name split per element
+        tag = element.tag
+
+        if tag == _P_TAG:
+            para_index += 1
+            if para_index > toc_end_index:
+                para = paragraphs[para_index]
+                text = paragraph_texts[para_index]
+
+                # Extract images from this paragraph (both drawing and pict)
+                images = _extract_images_from_element(element, para_index)
+
+                # Check if paragraph uses frame positioning (w:framePr)
+                if images:
+                    frame_pr = element.find(_FRAMEPR_PATH)
+                    if frame_pr is not None:
+                        # Extract coordinates (try both namespaced and plain attrs)
+                        fx = frame_pr.get(_FRAME_X_ATTR) or frame_pr.get("x", "0")
+                        fy = frame_pr.get(_FRAME_Y_ATTR) or frame_pr.get("y", "0")
+                        images = [
+                            img._replace(
+                                frame_positioned=True,
+                                frame_x=int(fx) if fx.lstrip("-").isdigit() else 0,
+                                frame_y=int(fy) if fy.lstrip("-").isdigit() else 0,
+                            )
+                            for img in images
+                        ]
+
+                for img in images:
+                    yield img
+
+                if text:
+                    yield ParagraphElem(para_index, text, doc, para)
+
+        elif tag == _TBL_TAG:
+            table_index += 1
+            table = Table(element, body)
+
+            # Yield the entries of cells that start with a section number
+            # (e.g. "3.1 " or "24.1.6 ") in one scan. Merged cells repeat in
+            # row.cells; only the first occurrence of each underlying w:tc
+            # is read, split and yielded. The set holds the elements
+            # themselves, not id()s: lxml proxies are short-lived, so an id()
+            # can be reused by an unrelated cell once its proxy is freed.
+            has_header_cells = False
+            seen_cells = set()
+            for row_index, row in enumerate(table.rows):
+                for col_index, cell in enumerate(row.cells):
+                    tc = cell._tc
+                    if tc in seen_cells:
+                        continue
+                    seen_cells.add(tc)
+                    text = _tc_text(tc).strip()
+                    if not (text and _CELL_SECTION_RE.match(text)):
+                        continue
+                    has_header_cells = True
+
+                    # Split cell by section numbers (handles multiple entries in one cell)
+                    entry_num = 0
+                    for part in _CELL_SPLIT_RE.split(text):
+                        part = part.strip()
+                        if part and _CELL_SECTION_RE.match(part):
+                            entry_num += 1
+                            yield TableCellElem(
+                                f"T{table_index}R{row_index}C{col_index}E{entry_num}",
+                                part,
+                                cell,
+                            )
 
-                if has_headers:
-                    # Process each cell in the table for section headers
-                    seen_cells = (
-                        set()
-                    )  # Track cell IDs to avoid duplicates from merged cells
-                    for row_index, row in enumerate(table.rows):
-                        for col_index, cell in enumerate(row.cells):
-                            # Skip if we've already processed this cell (merged cells)
-                            cell_id = id(cell._element)
-                            if cell_id in seen_cells:
-                                continue
-                            seen_cells.add(cell_id)
-
-                            cell_text = cell.text.strip()
-                            # Must start with section pattern
-                            if cell_text and re.match(
-                                r"^\d+\.\d+(?:\.\d+)?\s+", cell_text
-                            ):
-                                # Split cell by section numbers (handles multiple entries in one cell)
-                                parts = re.split(
-                                    r"(?=^\d+\.\d+(?:\.\d+)?\s+)",
-                                    cell_text,
-                                    flags=re.MULTILINE,
-                                )
-
-                                entry_num = 0
-                                for part in parts:
-                                    part = part.strip()
-                                    if part and re.match(
-                                        r"^\d+\.\d+(?:\.\d+)?\s+", part
-                                    ):
-                                        entry_num += 1
-                                        yield {
-                                            "type": "table_cell",
-                                            "index": f"T{table_index}R{row_index}C{col_index}E{entry_num}",
-                                            "text": part,
-                                            "doc": None,
-                                            "element": cell,
-                                        }
-                else:
-                    # Yield entire table if no headers found
-                    yield {
-                        "type": "table",
-                        "index": table_index,
-                        "element": table,
-                    }
+            if not has_header_cells:
+                # Yield entire table if no headers found
+                yield TableElem(table_index, table)
 
 
 def parse_document_structure(doc, exceptions, expected_sequence=None):
@@ -875,7 +1198,7 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
         print(f"✓ Extracted {len(expected_sequence)} expected entries")
 
     print("Finding TOC end...")
-    toc_end_index = find_toc_end(doc)
+    _, toc_end_index = extract_toc_and_end(doc)
     print(f"✓ TOC section ends at paragraph {toc_end_index}")
 
     print("\nParsing document structure...")
@@ -883,6 +1206,13 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
     expected_index = 0
     found_count = 0
 
+    # First TOC entry for each number, for validating out-of-sequence headings
+    toc_index = {}
+    for entry in expected_sequence:
+        toc_index.setdefault(
+            (entry.chapter, entry.section, entry.subsection), entry
+        )
+
     # Structure: chapters[chapter_num] = {sections: {section_num: {subsections: {subsec_num: elements}}}}
     chapters = {}
     current_chapter = None
@@ -894,29 +1224,50 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
     section_elements = {}  # (chapter, section) -> list of elements
     subsection_elements = {}  # (chapter, section, subsection) -> list of elements
 
+    # Element lists are created eagerly with their unit: an empty list still
+    # makes build_book_json write that unit's page, so no defaultdict here
+    def _ensure_chapter(chapter):
+        """Create the chapter entry and its element list on first use."""
+        chapter_data = chapters.get(chapter)
+        if chapter_data is None:
+            chapter_data = chapters[chapter] = {"sections": {}}
+            chapter_elements[chapter] = []
+        return chapter_data
+
+    def _ensure_section(chapter, section):
+        """Create the section (and its chapter) on first use."""
+        sections = _ensure_chapter(chapter)["sections"]
+        section_data = sections.get(section)
+        if section_data is None:
+            section_data = sections[section] = {"subsections": {}}
+            section_elements[(chapter, section)] = []
+        return section_data
+
     for source in get_document_elements_in_order(doc, toc_end_index):
         # Handle images separately - they don't have element_obj initially
-        if source["type"] == "image":
+        if source.type == "image":
             element_obj = (
-                source["image_part"],
-                source["index"],
-                source.get("alt", ""),
-                source.get("caption", ""),
-                source.get("rId", ""),
-                source.get("content_type", ""),
+                source.image_part,
+                source.index,
+                source.alt,
+                source.caption,
+                source.rId,
+                source.content_type,
             )
         else:
-            element_obj = source["element"]
+            element_obj = source.element
 
         # Try to parse numbering for paragraphs and table cells
         parsed = None
-        if source["type"] == "paragraph":
-            text = source["text"]
-            parsed = extract_number_and_title(text, source["doc"], source["index"])
+        if source.type == "paragraph":
+            text = source.text
+            parsed = extract_number_and_title(
+                text, _cached_paragraph_texts(source.doc), source.index
+            )
             # Fallback: if no number found, check if heading style matches a TOC entry
             if parsed is None and expected_sequence:
-                para_obj = source["element"]
-                style_name = para_obj.style.name if para_obj.style else ""
+                para_obj = source.element
+                style_name = paragraph_style_name(para_obj)
                 if style_name.startswith("Heading"):
                     para_title = normalize_for_comparison(text)
                     if len(para_title) > 3:
@@ -927,18 +1278,14 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
                             expected_index, len(expected_sequence)
                         ):
                             look_entry = expected_sequence[look_idx]
-                            look_title_only = re.sub(
-                                r"^\d+\.\d+(?:\.\d+)?\s*", "",
-                                look_entry["title_normalized"],
-                            )
-                            if (
-                                len(look_title_only) > 3
-                                and (
-                                    para_title in look_title_only
-                                    or look_title_only in para_title
-                                )
+                            look_title_only = look_entry.title_only
+                            look_title_len = len(look_title_only)
+                            if look_title_len > 3 and (
+                                para_title in look_title_only
+                                if len(para_title) <= look_title_len
+                                else look_title_only in para_title
                             ):
-                                is_chapter = look_entry["section"] == 0
+                                is_chapter = look_entry.section == 0
                                 gap = look_idx - expected_index
                                 # Accept immediately if it's nearby (within 10)
                                 if gap <= 10:
@@ -951,13 +1298,13 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
                                     break
                         if best_match is not None:
                             match_entry = expected_sequence[best_match]
-                            ch = match_entry["chapter"]
-                            sec = match_entry["section"]
-                            sub = match_entry.get("subsection")
+                            ch = match_entry.chapter
+                            sec = match_entry.section
+                            sub = match_entry.subsection
                             parsed = (ch, sec, sub, text)
                             expected_index = best_match + 1
-        elif source["type"] == "table_cell":
-            text = source["text"]
+        elif source.type == "table_cell":
+            text = source.text
             parsed = extract_number_and_title(text, None, None)
 
         if parsed:
@@ -984,18 +1331,18 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
             found_count += 1
 
             # For table cells with headers, create a pseudo-paragraph element
-            if source["type"] == "table_cell":
-                element_obj = ("table_cell", source["index"], source["text"])
+            if source.type == "table_cell":
+                element_obj = ("table_cell", source.index, source.text)
 
             # For images, store image info with alt/caption
-            if source["type"] == "image":
+            if source.type == "image":
                 element_obj = (
-                    source["image_part"],
-                    source["index"],
-                    source.get("alt", ""),
-                    source.get("caption", ""),
-                    source.get("rId", ""),
-                    source.get("content_type", ""),
+                    source.image_part,
+                    source.index,
+                    source.alt,
+                    source.caption,
+                    source.rId,
+                    source.content_type,
                 )
 
             # Determine entry type
@@ -1010,9 +1357,9 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
             if expected_index < len(expected_sequence):
                 expected = expected_sequence[expected_index]
                 numbering_match = (
-                    expected["chapter"] == chapter
-                    and expected["section"] == section
-                    and expected.get("subsection") == subsection
+                    expected.chapter == chapter
+                    and expected.section == section
+                    and expected.subsection == subsection
                 )
 
                 if numbering_match:
@@ -1020,82 +1367,64 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
                 else:
                     # Try title match
                     text_normalized = normalize_for_comparison(full_text)
-                    text_title_only = re.sub(
-                        r"^\d+\.\d+(?:\.\d+)?\s*", "", text_normalized
-                    )
+                    text_title_only = strip_section_number(text_normalized)
+
+                    # Only the shorter title can be contained in the longer one
+                    text_title_len = len(text_title_only)
 
                     title_match_found = None
-                    for look_idx in range(
-                        expected_index, min(expected_index + 5, len(expected_sequence))
-                    ):
+                    look_end = min(expected_index + 5, len(expected_sequence))
+                    if text_title_len <= 3:
+                        look_end = expected_index
+                    for look_idx in range(expected_index, look_end):
                         look_entry = expected_sequence[look_idx]
-                        look_title_normalized = look_entry["title_normalized"]
-                        look_title_only = re.sub(
-                            r"^\d+\.\d+(?:\.\d+)?\s*", "", look_title_normalized
-                        )
+                        look_title_only = look_entry.title_only
 
                         if (
                             text_title_only in look_title_only
-                            or look_title_only in text_title_only
-                            or text_title_only == look_title_only
-                        ) and len(text_title_only) > 3:
+                            if text_title_len <= len(look_title_only)
+                            else look_title_only in text_title_only
+                        ):
                             title_match_found = (look_idx, look_entry)
                             break
 
                     if title_match_found:
                         match_idx, match_entry = title_match_found
-                        chapter = match_entry["chapter"]
-                        section = match_entry["section"]
-                        subsection = match_entry.get("subsection")
+                        chapter = match_entry.chapter
+                        section = match_entry.section
+                        subsection = match_entry.subsection
                         expected_index = match_idx + 1
                     else:
                         # Neither numbering nor title matches - validate it's in TOC
                         # Check if this exact numbering exists anywhere in TOC
                         found_in_toc = False
-                        for check_entry in expected_sequence:
-                            if (
-                                check_entry["chapter"] == chapter
-                                and check_entry["section"] == section
-                                and check_entry.get("subsection") == subsection
+                        check_entry = toc_index.get((chapter, section, subsection))
+                        if check_entry is not None:
+                            # Numbering exists in TOC - check if title is close enough
+                            toc_title_only = check_entry.title_only
+                            if text_title_len > 3 and (
+                                text_title_only in toc_title_only
+                                if text_title_len <= len(toc_title_only)
+                                else toc_title_only in text_title_only
                             ):
-                                # Numbering exists in TOC - check if title is close enough
-                                toc_title = check_entry["title_normalized"]
-                                toc_title_only = re.sub(
-                                    r"^\d+\.\d+(?:\.\d+)?\s*", "", toc_title
-                                )
-
-                                text_normalized = normalize_for_comparison(full_text)
-                                text_title_only = re.sub(
-                                    r"^\d+\.\d+(?:\.\d+)?\s*", "", text_normalized
-                                )
-
-                                if len(text_title_only) > 3 and (
-                                    text_title_only in toc_title_only
-                                    or toc_title_only in text_title_only
-                                ):
-                                    found_in_toc = True
-                                break
+                                found_in_toc = True
 
                         if not found_in_toc:
                             # False positive - skip it
                             found_count -= 1
                             continue
 
+            # Determine correct element type
+            elem_type = (
+                source.type if source.type in ("table_cell", "image") else "paragraph"
+            )
+
             # Update current structure
             if section == 0:
                 current_chapter = chapter
                 current_section = None
                 current_subsection = None
-                if chapter not in chapters:
-                    chapters[chapter] = {"sections": {}}
-                    chapter_elements[chapter] = []
-
-                # Determine correct element type
-                elem_type = (
-                    source["type"]
-                    if source["type"] in ("table_cell", "image")
-                    else "paragraph"
-                )
+                _ensure_chapter(chapter)
                 chapter_elements[chapter].append((elem_type, element_obj))
 
             elif subsection is None:
@@ -1103,21 +1432,7 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
                 current_chapter = chapter
                 current_section = section
                 current_subsection = None
-
-                if chapter not in chapters:
-                    chapters[chapter] = {"sections": {}}
-                    chapter_elements[chapter] = []
-
-                if section not in chapters[chapter]["sections"]:
-                    chapters[chapter]["sections"][section] = {"subsections": {}}
-                    section_elements[(chapter, section)] = []
-
-                # Determine correct element type
-                elem_type = (
-                    source["type"]
-                    if source["type"] in ("table_cell", "image")
-                    else "paragraph"
-                )
+                _ensure_section(chapter, section)
                 section_elements[(chapter, section)].append((elem_type, element_obj))
 
             else:
@@ -1126,51 +1441,30 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
                 current_section = section
                 current_subsection = subsection
 
-                if chapter not in chapters:
-                    chapters[chapter] = {"sections": {}}
-                    chapter_elements[chapter] = []
-
-                if section not in chapters[chapter]["sections"]:
-                    chapters[chapter]["sections"][section] = {"subsections": {}}
-                    section_elements[(chapter, section)] = []
-
-                if (
-                    subsection
-                    not in chapters[chapter]["sections"][section]["subsections"]
-                ):
-                    chapters[chapter]["sections"][section]["subsections"][
-                        subsection
-                    ] = []
-                    subsection_elements[(chapter, section, subsection)] = []
-
-                # Determine correct element type
-                elem_type = (
-                    source["type"]
-                    if source["type"] in ("table_cell", "image")
-                    else "paragraph"
-                )
-                subsection_elements[(chapter, section, subsection)].append(
-                    (elem_type, element_obj)
-                )
+                subsections = _ensure_section(chapter, section)["subsections"]
+                key = (chapter, section, subsection)
+                elements = subsection_elements.get(key)
+                if elements is None:
+                    subsections[subsection] = []
+                    elements = subsection_elements[key] = []
+                elements.append((elem_type, element_obj))
         else:
             # Non-numbered element - add to current structure
+            # One dict lookup per element: get() instead of "in" then index
             if current_chapter is not None:
                 if current_subsection is not None:
                     # Add to subsection
-                    key = (current_chapter, current_section, current_subsection)
-                    if key in subsection_elements:
-                        subsection_elements[key].append((source["type"], element_obj))
+                    elements = subsection_elements.get(
+                        (current_chapter, current_section, current_subsection)
+                    )
                 elif current_section is not None:
                     # Add to section
-                    key = (current_chapter, current_section)
-                    if key in section_elements:
-                        section_elements[key].append((source["type"], element_obj))
+                    elements = section_elements.get((current_chapter, current_section))
                 else:
                     # Add to chapter
-                    if current_chapter in chapter_elements:
-                        chapter_elements[current_chapter].append(
-                            (source["type"], element_obj)
-                        )
+                    elements = chapter_elements.get(current_chapter)
+                if elements is not None:
+                    elements.append((source.type, element_obj))
 
     print(f"✓ Found {found_count} numbered entries")
     print(f"✓ Organized into {len(chapters)} chapters")
@@ -1178,33 +1472,37 @@ def parse_document_structure(doc, exceptions, expected_sequence=None):
     return chapters, chapter_elements, section_elements, subsection_elements
 
 
-def _is_caption_paragraph(elem_type, elem_obj):
-    """Check if a paragraph element looks like an image caption.
+def _caption_text(elem_type, elem_obj, paragraph_texts=None):
+    """Return the stripped text if a paragraph element looks like an image caption.
 
     Signals: italic formatting, 3+ tab indentation, short text, not a section number.
+    Returns None for anything that is not a caption. paragraph_texts, if
+    given, maps id(paragraph) to its already stripped text.
     """
     if elem_type != "paragraph":
-        return False
+        return None
     if not hasattr(elem_obj, "text"):
-        return False
-    text = elem_obj.text.strip()
+        return None
+    text = paragraph_texts.get(id(elem_obj)) if paragraph_texts else None
+    if text is None:
+        text = elem_obj.text.strip()
     if not text or len(text) >= 200:
-        return False
-    if re.match(r"^\d+\.\d+", text):
-        return False
+        return None
+    if _SECNUM_START_RE.match(text):
+        return None
+
+    # Check for tab indentation (3+ tabs) first: the C-level iter stops at
+    # the third tab and rules out most paragraphs without building any runs
+    tabs = elem_obj._element.iter(_TAB_TAG)
+    if next(islice(tabs, 2, None), None) is None:
+        return None
 
     # Check for italic runs
     has_italic = any(run.italic for run in elem_obj.runs if run.italic is not None)
     if not has_italic:
-        return False
-
-    # Check for tab indentation (3+ tabs) using lxml element search
-    w_ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-    tab_count = len(elem_obj._element.findall(f".//{{{w_ns}}}tab"))
-    if tab_count < 3:
-        return False
+        return None
 
-    return True
+    return text
 
 
 def _section_label(key_type, key):
@@ -1218,14 +1516,16 @@ def _section_label(key_type, key):
 
 
 def reconcile_captions_and_images(
-    chapters, chapter_elements, section_elements, subsection_elements
+    chapters, chapter_elements, section_elements, subsection_elements, doc=None
 ):
     """Identify images that should be relocated to match orphan captions.
 
     Scans for sections that have caption-like paragraphs but no images,
     and adjacent sections (same chapter) that have images without captions.
     Returns relocation records without mutating the element dictionaries.
+    If doc is given, paragraph texts come from its cached stripped texts.
     """
+    paragraph_texts = _cached_paragraph_text_map(doc) if doc is not None else None
     relocations = []
     orphan_captions = []
 
@@ -1250,32 +1550,41 @@ def reconcile_captions_and_images(
         else:
             return subsection_elements.get(key, [])
 
-    def _has_images(elements):
-        return any(et == "image" for et, _ in elements)
-
-    def _has_caption(elements):
-        return any(_is_caption_paragraph(et, eo) for et, eo in elements)
+    # Sections are checked again as donors, so each one's first caption
+    # (or None) and whether it has images are found in one walk and remembered
+    summaries = {}
+
+    def _summary(key_type, key, elements):
+        k = (key_type, key)
+        summary = summaries.get(k)
+        if summary is None:
+            caption = None
+            has_images = False
+            for et, eo in elements:
+                if et == "image":
+                    has_images = True
+                    if caption is not None:
+                        break
+                elif caption is None:
+                    caption = _caption_text(et, eo, paragraph_texts)
+                    if caption is not None and has_images:
+                        break
+            summary = summaries[k] = (caption, has_images)
+        return summary
 
     def _chapter_of(key_type, key):
         if key_type == "chapter":
             return key
         return key[0]
 
-    def _get_caption_text(elements):
-        for et, eo in elements:
-            if _is_caption_paragraph(et, eo):
-                return eo.text.strip()
-        return ""
-
     # Scan for sections with captions but no images
     for idx, (key_type, key) in enumerate(all_keys):
         elements = _get_elements(key_type, key)
 
-        if not _has_caption(elements) or _has_images(elements):
+        caption_text, has_images = _summary(key_type, key, elements)
+        if caption_text is None or has_images:
             continue
 
-        caption_text = _get_caption_text(elements)
-
         # Found orphan caption section — look backward 1-2 sections for a donor
         found_donor = False
         for look_back in range(1, 3):
@@ -1289,8 +1598,11 @@ def reconcile_captions_and_images(
                 break
 
             donor_elements = _get_elements(donor_key_type, donor_key)
+            donor_caption, donor_has_images = _summary(
+                donor_key_type, donor_key, donor_elements
+            )
 
-            if _has_images(donor_elements) and not _has_caption(donor_elements):
+            if donor_has_images and donor_caption is None:
                 # Record relocation for each image in the donor
                 images_in_donor = [
                     (et, eo) for et, eo in donor_elements if et == "image"
@@ -1353,57 +1665,50 @@ def validate_image_sequence(
     total_warnings = 0
 
     for chapter_num in sorted(chapters.keys()):
-        # Collect (section_key_label, image_index) pairs in document order
-        sequence = []
-
-        # Chapter intro
-        for et, eo in chapter_elements.get(chapter_num, []):
-            if et == "image":
-                sequence.append((f"{chapter_num}.0", eo[1]))
-
-        # Sections and subsections
-        for section_num in sorted(chapters[chapter_num]["sections"].keys()):
+        # The chapter's pages in document order, keyed by their number parts
+        sections = chapters[chapter_num]["sections"]
+        pages = [((chapter_num, 0), chapter_elements.get(chapter_num, []))]
+        for section_num in sorted(sections.keys()):
             key = (chapter_num, section_num)
-            for et, eo in section_elements.get(key, []):
-                if et == "image":
-                    sequence.append((f"{chapter_num}.{section_num}", eo[1]))
-
-            for subsection_num in sorted(
-                chapters[chapter_num]["sections"][section_num]["subsections"].keys()
-            ):
+            pages.append((key, section_elements.get(key, [])))
+            for subsection_num in sorted(sections[section_num]["subsections"].keys()):
                 sub_key = (chapter_num, section_num, subsection_num)
-                for et, eo in subsection_elements.get(sub_key, []):
-                    if et == "image":
-                        sequence.append(
-                            (f"{chapter_num}.{section_num}.{subsection_num}", eo[1])
-                        )
+                pages.append((sub_key, subsection_elements.get(sub_key, [])))
 
-        # Walk sequence and check monotonicity
+        # Check monotonicity while walking the pages, without first collecting
+        # every image into a list; labels are only formatted for warnings
         max_seen = -1
+        image_count = 0
         chapter_warnings = []
-        for section_label, img_idx in sequence:
-            if img_idx < max_seen:
-                gap = max_seen - img_idx
-                print(
-                    f"  WARNING: Image #{img_idx} in section {section_label}"
-                    f" is out of sequence (previous max #{max_seen}, gap={gap})"
-                )
-                chapter_warnings.append(
-                    {
-                        "image_index": img_idx,
-                        "section": section_label,
-                        "previous_max": max_seen,
-                        "gap": gap,
-                    }
-                )
-                total_warnings += 1
-            if img_idx > max_seen:
-                max_seen = img_idx
+        for page_key, elements in pages:
+            for et, eo in elements:
+                if et != "image":
+                    continue
+                image_count += 1
+                img_idx = eo[1]
+                if img_idx < max_seen:
+                    section_label = ".".join(map(str, page_key))
+                    gap = max_seen - img_idx
+                    print(
+                        f"  WARNING: Image #{img_idx} in section {section_label}"
+                        f" is out of sequence (previous max #{max_seen}, gap={gap})"
+                    )
+                    chapter_warnings.append(
+                        {
+                            "image_index": img_idx,
+                            "section": section_label,
+                            "previous_max": max_seen,
+                            "gap": gap,
+                        }
+                    )
+                    total_warnings += 1
+                if img_idx > max_seen:
+                    max_seen = img_idx
 
         chapter_results.append(
             {
                 "chapter": chapter_num,
-                "image_count": len(sequence),
+                "image_count": image_count,
                 "status": "warnings" if chapter_warnings else "ok",
                 "warnings": chapter_warnings,
             }
@@ -1418,11 +1723,14 @@ def validate_image_sequence(
     return {"chapters": chapter_results}
 
 
-def extract_paragraph_json(para):
-    """Extract paragraph data as JSON (md2rag format)."""
+def extract_paragraph_json(para, text=None):
+    """Extract paragraph data as JSON (md2rag format).
+
+    text, if given, is para.text already read by the caller.
+    """
     return {
         "type": "paragraph",
-        "text": para.text,
+        "text": para.text if text is None else text,
     }
 
 
@@ -1436,12 +1744,36 @@ def extract_image_json(image_path, alt="", caption=""):
     }
 
 
-def extract_table_json(table):
-    """Extract table data as JSON (md2rag format)."""
+def _tc_text(tc):
+    """Return a <w:tc>'s text, the same string as _Cell.text."""
+    return "\n".join([paragraph_xml_text(p) for p in tc.iterchildren(_P_TAG)])
+
+
+def table_cell_texts(table):
+    """Return the table's cell texts as a list of rows of strings."""
+    # Merged cells repeat across grid positions; read each one's text once
+    cell_texts = {}
     rows = []
     for row in table.rows:
-        cells = [{"text": cell.text} for cell in row.cells]
-        rows.append({"cells": cells})
+        cells = []
+        for cell in row.cells:
+            tc = cell._tc
+            text = cell_texts.get(tc)
+            if text is None:
+                text = cell_texts[tc] = _tc_text(tc)
+            cells.append(text)
+        rows.append(cells)
+    return rows
+
+
+def extract_table_json(table, cell_rows=None):
+    """Extract table data as JSON (md2rag format).
+
+    cell_rows, if given, is table_cell_texts(table) already read by the caller.
+    """
+    if cell_rows is None:
+        cell_rows = table_cell_texts(table)
+    rows = [{"cells": [{"text": text} for text in cells]} for cells in cell_rows]
 
     return {"type": "table", "rows": rows}
 
@@ -1461,9 +1793,8 @@ def extract_table_cell_json(cell_data):
     }
 
 
-def create_markdown_css():
-    """Create CSS file for markdown styling."""
-    css_content = """/* Markdown Styling */
+# Stylesheet for the markdown export, built once at import
+_MARKDOWN_CSS = """/* Markdown Styling */
 
 :root {
     --primary-color: #2c3e50;
@@ -1651,80 +1982,81 @@ hr {
     }
 }
 """
-    return css_content
+
+
+def create_markdown_css():
+    """Create CSS file for markdown styling."""
+    return _MARKDOWN_CSS
 
 
 def create_markdown_index(chapters, markdown_dir):
     """Create README.md index file for markdown chapters."""
-    lines = [
-        "# Book Content - Markdown Format",
-        "",
-        "This directory contains the book content in Markdown format, generated from the Word document.",
-        "",
-        "## Chapters",
-        "",
-    ]
+    readme_path = os.path.join(markdown_dir, "README.md")
+    # Assemble the whole file, then hand it to the OS in one write
+    parts = []
+    write = parts.append
+    write(
+        "# Book Content - Markdown Format\n"
+        "\n"
+        "This directory contains the book content in Markdown format, generated from the Word document.\n"
+        "\n"
+        "## Chapters\n"
+        "\n"
+    )
 
-    for chapter_num in sorted(chapters.keys()):
+    for chapter_num in sorted(chapters):
         chapter_data = chapters[chapter_num]
-        chapter_title = f"Chapter {chapter_num}"
+        sections = chapter_data["sections"]
+        chapter_dir = f"{chapter_num:02d}"
 
         # Extract title from first section if available
-        if chapter_data.get("sections"):
-            chapter_title = f"{chapter_num}.0"
+        chapter_title = f"{chapter_num}.0" if sections else f"Chapter {chapter_num}"
 
-        lines.append(f"### [{chapter_title}]({chapter_num:02d}/intro.md)")
-        lines.append("")
+        write(f"### [{chapter_title}]({chapter_dir}/intro.md)\n\n")
 
         # List sections
-        for section_num in sorted(chapter_data["sections"].keys()):
-            section_data = chapter_data["sections"][section_num]
-            lines.append(
-                f"- [{chapter_num}.{section_num}]({chapter_num:02d}/{section_num:02d}.md)"
-            )
+        for section_num in sorted(sections):
+            subsections = sections[section_num].get("subsections")
+            sec_label = f"{chapter_num}.{section_num}"
+            sec_path = f"{chapter_dir}/{section_num:02d}"
+            write(f"- [{sec_label}]({sec_path}.md)\n")
 
             # List subsections
-            if section_data.get("subsections"):
-                for subsection_num in sorted(section_data["subsections"].keys()):
-                    lines.append(
-                        f"  - [{chapter_num}.{section_num}.{subsection_num}]({chapter_num:02d}/{section_num:02d}_{subsection_num:02d}.md)"
+            if subsections:
+                for subsection_num in sorted(subsections):
+                    write(
+                        f"  - [{sec_label}.{subsection_num}]"
+                        f"({sec_path}_{subsection_num:02d}.md)\n"
                     )
 
-        lines.append("")
-
-    lines.extend(
-        [
-            "---",
-            "",
-            "## Viewing",
-            "",
-            "Open any `.md` file in a Markdown viewer or editor. For best results with styling:",
-            "",
-            "1. Use a Markdown viewer that supports custom CSS",
-            "2. Link to `style.css` in the markdown files",
-            "3. Or use the web viewer for the full interactive experience",
-            "",
-            "## Format",
-            "",
-            "- **Bold text** indicates important terms or emphasis",
-            "- *Italic text* for references or subtle emphasis",
-            "- Tables are formatted with markdown table syntax",
-            "- Lists use standard markdown list formatting",
-            "",
-        ]
+        write("\n")
+
+    write(
+        "---\n"
+        "\n"
+        "## Viewing\n"
+        "\n"
+        "Open any `.md` file in a Markdown viewer or editor. For best results with styling:\n"
+        "\n"
+        "1. Use a Markdown viewer that supports custom CSS\n"
+        "2. Link to `style.css` in the markdown files\n"
+        "3. Or use the web viewer for the full interactive experience\n"
+        "\n"
+        "## Format\n"
+        "\n"
+        "- **Bold text** indicates important terms or emphasis\n"
+        "- *Italic text* for references or subtle emphasis\n"
+        "- Tables are formatted with markdown table syntax\n"
+        "- Lists use standard markdown list formatting\n"
     )
 
-    # Write README
-    readme_path = os.path.join(markdown_dir, "README.md")
-    with open(readme_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    write_text(readme_path, "".join(parts))
 
     print(f"\n✓ Created markdown index: {readme_path}")
 
     # Write CSS file
     css_path = os.path.join(markdown_dir, "style.css")
-    with open(css_path, "w", encoding="utf-8") as f:
-        f.write(create_markdown_css())
+    write_text(css_path, _MARKDOWN_CSS)
 
     print(f"✓ Created CSS file: {css_path}")
 
@@ -1734,6 +2066,10 @@ def format_text_markdown(text, runs=None):
     if not runs:
         return text
 
+    # Common case: plain runs need no markers, only concatenation
+    if not any(run.get("bold") or run.get("italic") for run in runs):
+        return "".join([run.get("text", "") for run in runs]) or text
+
     result = []
     for run in runs:
         run_text = run.get("text", "")
@@ -1753,25 +2089,29 @@ def format_text_markdown(text, runs=None):
     return "".join(result) if result else text
 
 
-def extract_paragraph_markdown(para):
-    """Extract paragraph as markdown."""
-    text = para.text.strip()
+def extract_paragraph_markdown(para, text=None, runs_data=None):
+    """Extract paragraph as markdown.
+
+    text and runs_data, if given, come from paragraph_text_and_runs(para).
+    """
+    text = (para.text if text is None else text).strip()
     if not text:
         return ""
 
     # Check for heading styles
-    style_name = para.style.name if para.style else ""
+    style_name = paragraph_style_name(para)
 
     # Format runs for inline formatting
-    runs_data = []
-    for run in para.runs:
-        runs_data.append(
-            {
-                "text": run.text,
-                "bold": run.bold,
-                "italic": run.italic,
-            }
-        )
+    if runs_data is None:
+        runs_data = []
+        for run in para.runs:
+            runs_data.append(
+                {
+                    "text": run.text,
+                    "bold": run.bold,
+                    "italic": run.italic,
+                }
+            )
 
     formatted_text = format_text_markdown(text, runs_data)
 
@@ -1784,39 +2124,52 @@ def extract_paragraph_markdown(para):
     return formatted_text
 
 
-def extract_table_markdown(table):
-    """Extract table as markdown."""
-    if not table.rows:
-        return ""
+def extract_table_markdown(table, cell_rows=None):
+    """Extract table as markdown.
 
-    lines = []
+    cell_rows, if given, is table_cell_texts(table) already read by the caller.
+    """
+    if cell_rows is None:
+        cell_rows = table_cell_texts(table)
+    if not cell_rows:
+        return ""
 
-    # Process rows
-    for row_idx, row in enumerate(table.rows):
-        cells = []
-        for cell in row.cells:
-            cell_text = cell.text.strip().replace("\n", " ")
-            cells.append(cell_text)
+    # Merged cells repeat across grid positions; clean each distinct text once
+    cleaned = {}
 
-        # Create table row
-        lines.append("| " + " | ".join(cells) + " |")
+    def row_line(cells):
+        out = []
+        for text in cells:
+            cell_text = cleaned.get(text)
+            if cell_text is None:
+                cell_text = cleaned[text] = text.strip().replace("\n", " ")
+            out.append(cell_text)
+        return "| " + " | ".join(out) + " |"
 
-        # Add separator after first row (header)
-        if row_idx == 0:
-            lines.append("| " + " | ".join(["---"] * len(cells)) + " |")
+    # Header row, then its separator, then the remaining rows
+    lines = [
+        row_line(cell_rows[0]),
+        "| " + " | ".join(["---"] * len(cell_rows[0])) + " |",
+    ]
+    for cells in cell_rows[1:]:
+        lines.append(row_line(cells))
 
     return "\n".join(lines)
 
 
 def save_markdown_file(
-    filepath, content_items, chapter_num, section_num=None, subsection_num=None
+    filepath, md_blocks, chapter_num, section_num=None, subsection_num=None
 ):
-    """Save content as markdown file."""
-    lines = []
+    """Save content as markdown file.
+
+    md_blocks are the rendered markdown blocks from build_content.
+    """
+    # Assemble the page, then hand it to the OS in one write
+    parts = []
+    write = parts.append
 
     # Add HTML head with CSS link for better viewing
-    lines.append('<link rel="stylesheet" href="../style.css">')
-    lines.append("")
+    write('<link rel="stylesheet" href="../style.css">\n\n')
 
     # Add navigation breadcrumb
     nav_parts = ["[Home](../README.md)"]
@@ -1827,57 +2180,30 @@ def save_markdown_file(
     if subsection_num is not None:
         nav_parts.append(f"Subsection {subsection_num}")
 
-    lines.append(" → ".join(nav_parts))
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    write(" → ".join(nav_parts))
+    write("\n\n---\n\n")
 
     # Add header
     if subsection_num is not None:
-        lines.append(f"# {chapter_num}.{section_num}.{subsection_num}")
+        write(f"# {chapter_num}.{section_num}.{subsection_num}\n\n")
     elif section_num is not None:
-        lines.append(f"# {chapter_num}.{section_num}")
+        write(f"# {chapter_num}.{section_num}\n\n")
     else:
-        lines.append(f"# Chapter {chapter_num}")
-
-    lines.append("")
-
-    # Process content items
-    for item_type, elem in content_items:
-        if item_type == "paragraph":
-            md_text = extract_paragraph_markdown(elem)
-            if md_text:
-                lines.append(md_text)
-                lines.append("")
-        elif item_type == "table":
-            md_table = extract_table_markdown(elem)
-            if md_table:
-                lines.append(md_table)
-                lines.append("")
-        elif item_type == "table_cell":
-            # Handle table cell headers
-            if isinstance(elem, tuple) and len(elem) == 3:
-                lines.append(f"**{elem[2]}**")
-                lines.append("")
-        elif item_type == "image":
-            # Handle images - elem is the relative path
-            if isinstance(elem, str):
-                lines.append(f"![Image]({elem})")
-                lines.append("")
+        write(f"# Chapter {chapter_num}\n\n")
+
+    # Content blocks
+    for block in md_blocks:
+        write(f"{block}\n\n")
 
     # Add footer navigation
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append('<div class="nav-links">')
-    lines.append('<a href="../README.md">← Back to Index</a>')
-    lines.append(f'<a href="intro.md">Chapter {chapter_num} Home</a>')
-    lines.append("</div>")
+    write("\n---\n\n")
+    write('<div class="nav-links">\n')
+    write('<a href="../README.md">← Back to Index</a>\n')
+    write(f'<a href="intro.md">Chapter {chapter_num} Home</a>\n')
+    write("</div>")
 
-    # Write file
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    ensure_dir(os.path.dirname(filepath))
+    write_text(filepath, "".join(parts))
 
 
 def create_navigation_index(
@@ -1887,10 +2213,10 @@ def create_navigation_index(
     # Build a map of chapter/section numbers to titles from TOC
     title_map = {}
     for entry in expected_sequence:
-        chapter = entry["chapter"]
-        section = entry.get("section", 0)
-        subsection = entry.get("subsection")
-        title = entry["title"]
+        chapter = entry.chapter
+        section = entry.section
+        subsection = entry.subsection
+        title = entry.title
 
         if subsection is not None:
             key = (chapter, section, subsection)
@@ -1911,7 +2237,10 @@ def create_navigation_index(
 
         # Get chapter title
         chapter_key = (chapter_num, "chapter")
-        chapter_title = title_map.get(chapter_key, f"Chapter {chapter_num}")
+        if chapter_key in title_map:
+            chapter_title = title_map[chapter_key]
+        else:
+            chapter_title = f"Chapter {chapter_num}"
 
         chapter_obj = {"number": chapter_num, "title": chapter_title, "sections": []}
 
@@ -1928,7 +2257,10 @@ def create_navigation_index(
         # Add regular sections
         for section_num in sorted(chapter_data["sections"].keys()):
             section_key = (chapter_num, section_num)
-            section_title = title_map.get(section_key, f"{chapter_num}.{section_num}")
+            if section_key in title_map:
+                section_title = title_map[section_key]
+            else:
+                section_title = f"{chapter_num}.{section_num}"
 
             chapter_obj["sections"].append(
                 {
@@ -1950,8 +2282,374 @@ def create_navigation_index(
 
     # Write index.json
     index_path = os.path.join(output_dir, "index.json")
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(index_data, f, indent=2)
+    write_json(index_path, index_data)
+
+
+def paragraph_text_and_runs(para):
+    """Return (para.text, run data for markdown) from one walk of the <w:p>."""
+    parts = []
+    runs_data = []
+    for child in para._p.iterchildren(_R_TAG, _HYPERLINK_TAG):
+        if child.tag != _R_TAG:
+            parts.extend([run_text(r) for r in child.iterchildren(_R_TAG)])
+            continue
+        child_text = run_text(child)
+        parts.append(child_text)
+        bold = italic = None
+        rPr = child.rPr
+        if rPr is not None:
+            if rPr.b is not None:
+                bold = rPr.b.val
+            if rPr.i is not None:
+                italic = rPr.i.val
+        runs_data.append({"text": child_text, "bold": bold, "italic": italic})
+    return "".join(parts), runs_data
+
+
+def _paragraph_content(para, markdown):
+    if not markdown:
+        return extract_paragraph_json(para), ""
+    text, runs_data = paragraph_text_and_runs(para)
+    md_text = extract_paragraph_markdown(para, text, runs_data)
+    return extract_paragraph_json(para, text), md_text
+
+
+def _table_content(table, markdown):
+    cell_rows = table_cell_texts(table)
+    md_table = extract_table_markdown(table, cell_rows) if markdown else ""
+    return extract_table_json(table, cell_rows), md_table
+
+
+def _table_cell_content(cell_data, markdown):
+    md_text = ""
+    if isinstance(cell_data, tuple) and len(cell_data) == 3:
+        md_text = f"**{cell_data[2]}**"
+    return extract_table_cell_json(cell_data), md_text
+
+
+# Element type -> handler returning (md2rag JSON item, markdown block or "")
+_CONTENT_HANDLERS = {
+    "paragraph": _paragraph_content,
+    "table": _table_content,
+    "table_cell": _table_cell_content,
+}
+
+
+def build_content(elements, section_path, chapter_dir_name, image_manifest, markdown):
+    """Build the md2rag content and markdown blocks for one page.
+
+    Images get paths under pictures/{section_path}/ and are recorded in
+    image_manifest for process_images.py. Returns (content, md_blocks);
+    md_blocks is empty unless markdown is true.
+    """
+    content = []
+    md_blocks = []
+    md_images = []
+    for elem_type, elem in elements:
+        handler = _CONTENT_HANDLERS.get(elem_type)
+        if handler is not None:
+            item, md_block = handler(elem, markdown)
+            content.append(item)
+            if md_block:
+                md_blocks.append(md_block)
+        elif elem_type == "image":
+            # elem is a tuple: (image_part, image_index, alt, caption, rId, content_type)
+            if isinstance(elem, tuple) and len(elem) >= 2:
+                img_idx = elem[1]
+                alt_text = elem[2] if len(elem) > 2 else ""
+                caption_text = elem[3] if len(elem) > 3 else ""
+                r_id = elem[4] if len(elem) > 4 else ""
+                content_type = elem[5] if len(elem) > 5 else ""
+
+                image_filename = f"{img_idx:03d}.png"
+                image_rel_path = f"pictures/{section_path}/{image_filename}"
+                content.append(
+                    extract_image_json(image_rel_path, alt_text, caption_text)
+                )
+
+                # Add to image manifest for process_images.py
+                image_manifest.append(
+                    {
+                        "image_index": img_idx,
+                        "rId": r_id,
+                        "content_type": content_type,
+                        "section_path": section_path,
+                        "filename": image_filename,
+                        "alt": alt_text,
+                        "caption": caption_text,
+                        "chapter_dir": chapter_dir_name,
+                    }
+                )
+
+                # Track markdown image path
+                if markdown:
+                    md_images.append(f"![Image](pictures/{image_filename})")
+
+    md_blocks.extend(md_images)
+    return content, md_blocks
+
+
+def write_chapter(job, chapter_num):
+    """Write one chapter's JSON and markdown files.
+
+    job holds the parsed book (see build_book_json). Returns (image manifest
+    entries, log lines) so the caller can merge and print results in chapter
+    order whichever process did the work.
+    """
+    chapters = job["chapters"]
+    chapter_elements = job["chapter_elements"]
+    section_elements = job["section_elements"]
+    subsection_elements = job["subsection_elements"]
+    prev_next = job["prev_next"]
+    order_entries = job["order_entries"]
+    section_order = job["section_order"]
+    subsection_order = job["subsection_order"]
+    book_id = job["book_id"]
+    json_book_dir = job["json_book_dir"]
+    md_lang_dir = job["md_lang_dir"]
+
+    # Track images for image manifest
+    image_manifest = []  # For image_manifest.json (used by process_images.py)
+    log = []
+
+    # Get chapter title and create slugified directory name
+    intro_key = (chapter_num, 0, None)
+    chapter_entry = order_entries[intro_key]
+    chapter_title = chapter_entry.title
+    chapter_slug = chapter_entry.chapter_slug
+    chapter_dir_name = f"{chapter_num:02d}"
+
+    log.append(f"\n  Chapter {chapter_num} ({chapter_dir_name}):")
+
+    chapter_dir = os.path.join(json_book_dir, chapter_dir_name)
+    os.makedirs(chapter_dir, exist_ok=True)
+    # Files below are named by concatenating onto these prefixes
+    chapter_prefix = chapter_dir + os.sep
+
+    md_chapter_dir = None
+    if ENABLE_MARKDOWN:
+        md_chapter_dir = os.path.join(md_lang_dir, chapter_dir_name)
+        ensure_dir(md_chapter_dir)
+        md_chapter_prefix = md_chapter_dir + os.sep
+
+    chapter_data = chapters[chapter_num]
+
+    # Build intro section (chapter-level elements)
+    intro_content = []
+    intro_md = []
+    # Section path for intro: NN/intro
+    intro_section_path = f"{chapter_num:02d}/intro"
+
+    elements = chapter_elements.get(chapter_num)
+    if elements is not None:
+        intro_content, intro_md = build_content(
+            elements,
+            intro_section_path,
+            chapter_dir_name,
+            image_manifest,
+            md_chapter_dir is not None,
+        )
+
+    # Save intro with md2rag metadata
+    if intro_content:
+        intro_file_name = "intro"
+        prev_id, next_id = prev_next[intro_key]
+        # Human-readable section_id
+        section_id = build_section_id(chapter_slug)
+
+        intro_json = build_section_json(
+            intro_content,
+            book_id,
+            chapter_dir_name,
+            intro_file_name,
+            chapter_title,
+            section_id,
+            prev_id,
+            next_id,
+        )
+
+        intro_file = f"{chapter_prefix}{intro_file_name}.json"
+        write_json(intro_file, intro_json)
+        log.append(f"    ✓ {intro_file_name}.json ({len(intro_content)} items)")
+
+        # intro_content is only non-empty when the chapter has elements
+        if ENABLE_MARKDOWN and md_chapter_dir:
+            md_file = md_chapter_prefix + "intro.md"
+            save_markdown_file(md_file, intro_md, chapter_num)
+            log.append("    ✓ intro.md")
+
+    # Process sections
+    for section_num in section_order[chapter_num]:
+        section_data = chapter_data["sections"][section_num]
+
+        # Get section title and create slugified file name
+        # One key tuple per unit: doc_order / prev_next key, elements key
+        section_key = (chapter_num, section_num, None)
+        section_entry = order_entries[section_key]
+        section_title = section_entry.title
+        section_slug = section_entry.section_slug
+        section_file_name = f"{section_num:02d}"
+        # Section path for pictures: NN/SS
+        section_path = f"{chapter_num:02d}/{section_num:02d}"
+
+        # Build section content
+        section_content = []
+        section_md = []
+
+        elements = section_elements.get((chapter_num, section_num))
+        if elements is not None:
+            section_content, section_md = build_content(
+                elements,
+                section_path,
+                chapter_dir_name,
+                image_manifest,
+                md_chapter_dir is not None,
+            )
+
+        # Save section with md2rag metadata
+        prev_id, next_id = prev_next[section_key]
+        # Human-readable section_id
+        section_id = build_section_id(chapter_slug, section_slug)
+
+        section_json = build_section_json(
+            section_content,
+            book_id,
+            chapter_dir_name,
+            section_file_name,
+            section_title,
+            section_id,
+            prev_id,
+            next_id,
+        )
+
+        section_file = f"{chapter_prefix}{section_file_name}.json"
+        write_json(section_file, section_json)
+        log.append(f"    ✓ {section_file_name}.json ({len(section_content)} items)")
+
+        if ENABLE_MARKDOWN and md_chapter_dir and elements is not None:
+            md_file = f"{md_chapter_prefix}{section_file_name}.md"
+            save_markdown_file(md_file, section_md, chapter_num, section_num)
+            log.append(f"    ✓ {section_num:02d}.md")
+
+        # Process subsections
+        if section_data["subsections"]:
+            for subsection_num in subsection_order[(chapter_num, section_num)]:
+                # Get subsection title and create slugified file name
+                subsection_key = (chapter_num, section_num, subsection_num)
+                subsection_entry = order_entries[subsection_key]
+                subsection_title = subsection_entry.title
+                subsection_slug = subsection_entry.subsection_slug
+                subsection_file_name = (
+                    f"{section_num:02d}_{subsection_num:02d}"
+                )
+                # Section path for pictures: NN/SS_SS
+                subsection_path = f"{chapter_num:02d}/{section_num:02d}_{subsection_num:02d}"
+
+                subsection_content = []
+                subsection_md = []
+
+                elements = subsection_elements.get(subsection_key)
+                if elements is not None:
+                    subsection_content, subsection_md = build_content(
+                        elements,
+                        subsection_path,
+                        chapter_dir_name,
+                        image_manifest,
+                        md_chapter_dir is not None,
+                    )
+
+                # Save subsection with md2rag metadata
+                prev_id, next_id = prev_next[subsection_key]
+                # Human-readable section_id
+                sub_section_id = build_section_id(
+                    chapter_slug, section_slug, subsection_slug
+                )
+
+                subsection_json = build_section_json(
+                    subsection_content,
+                    book_id,
+                    chapter_dir_name,
+                    subsection_file_name,
+                    subsection_title,
+                    sub_section_id,
+                    prev_id,
+                    next_id,
+                )
+
+                subsection_file = f"{chapter_prefix}{subsection_file_name}.json"
+                write_json(subsection_file, subsection_json)
+                log.append(
+                    f"      ✓ {subsection_file_name}.json ({len(subsection_content)} items)"
+                )
+
+                if ENABLE_MARKDOWN and md_chapter_dir and elements is not None:
+                    md_file = f"{md_chapter_prefix}{subsection_file_name}.md"
+                    save_markdown_file(
+                        md_file,
+                        subsection_md,
+                        chapter_num,
+                        section_num,
+                        subsection_num,
+                    )
+                    log.append(f"      ✓ {subsection_file_name}.md")
+
+    return image_manifest, log
+
+
+# Parsed book inside a chapter pool worker; only set by _init_chapter_worker
+_worker_job = None
+
+
+def _init_chapter_worker(job):
+    """Pool initializer: keep the job for this worker's write_chapter calls."""
+    global _worker_job
+    _worker_job = job
+
+
+def _write_forked_chapter(chapter_num):
+    """write_chapter for a pool worker, using its job."""
+    return write_chapter(_worker_job, chapter_num)
+
+
+def write_chapters(job, chapter_nums):
+    """Run write_chapter for each chapter, yielding results in order."""
+    workers = min(len(chapter_nums), os.cpu_count() or 1)
+    # Fork is unavailable on Windows and unsafe on macOS; write in-process there
+    fork_safe = (
+        sys.platform != "darwin"
+        and "fork" in multiprocessing.get_all_start_methods()
+    )
+    if workers < 2 or not fork_safe:
+        for chapter_num in chapter_nums:
+            yield write_chapter(job, chapter_num)
+        return
+
+    # Element count per chapter, including its sections and subsections
+    sizes = {
+        chapter_num: len(elements)
+        for chapter_num, elements in job["chapter_elements"].items()
+    }
+    for elements_by_key in (job["section_elements"], job["subsection_elements"]):
+        for key, elements in elements_by_key.items():
+            sizes[key[0]] = sizes.get(key[0], 0) + len(elements)
+
+    # Forked workers inherit initargs instead of unpickling them, which the
+    # python-docx objects in the job would not survive; largest chapters
+    # are submitted first
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_chapter_worker,
+        initargs=(job,),
+    ) as executor:
+        futures = {
+            chapter_num: executor.submit(_write_forked_chapter, chapter_num)
+            for chapter_num in sorted(
+                chapter_nums, key=lambda num: sizes.get(num, 0), reverse=True
+            )
+        }
+        for chapter_num in chapter_nums:
+            yield futures[chapter_num].result()
 
 
 def build_book_json():
@@ -1984,8 +2682,10 @@ def build_book_json():
 
     # Load document
     print(f"Loading document: {input_docx}")
-    doc = Document(input_docx)
-    print(f"✓ Loaded {len(doc.paragraphs)} paragraphs, {len(doc.tables)} tables")
+    doc = open_document(input_docx)
+    print(
+        f"✓ Loaded {len(_cached_paragraphs(doc))} paragraphs, {len(doc.tables)} tables"
+    )
     print()
 
     # Extract TOC structure for navigation index
@@ -2002,56 +2702,63 @@ def build_book_json():
     # Analyse image-caption pairing (non-mutating — records relocations only)
     print("\nAnalysing image-caption pairs...")
     reconciliation = reconcile_captions_and_images(
-        chapters, chapter_elements, section_elements, subsection_elements
+        chapters, chapter_elements, section_elements, subsection_elements, doc
     )
 
-    # Build title map from expected sequence
-    title_map = {}
+    # Build title maps from expected sequence, one per heading level
+    chapter_titles = {}
+    section_titles = {}
+    subsection_titles = {}
     for entry in expected_sequence:
-        chapter = entry["chapter"]
-        section = entry.get("section", 0)
-        subsection = entry.get("subsection")
-        title = entry["title"]
+        chapter = entry.chapter
+        section = entry.section
+        subsection = entry.subsection
 
         if subsection is not None:
-            key = (chapter, section, subsection)
+            subsection_titles[(chapter, section, subsection)] = entry.title
         elif section == 0:
-            key = (chapter, "chapter")
+            chapter_titles[chapter] = entry.title
         else:
-            key = (chapter, section)
-
-        title_map[key] = title
+            section_titles[(chapter, section)] = entry.title
 
     # Build document order for prev/next links
     print("\nBuilding document order for navigation links...")
-    doc_order = build_document_order(chapters, title_map)
+    doc_order = build_document_order(
+        chapters, chapter_titles, section_titles, subsection_titles
+    )
     print(f"✓ {len(doc_order)} sections in document order")
 
-    # Create lookup for prev/next by position
-    # doc_order entries: (chapter_num, section_num, subsection_num, title, dir_name, file_name,
-    #                     chapter_slug, section_slug, subsection_slug)
+    # doc_order holds DocOrderEntry tuples
     book_id = config["canonical_id"]
 
-    def get_prev_next_ids(position):
-        """Get prev and next document IDs for a given position in doc_order."""
-        prev_id = None
-        next_id = None
-
-        if position > 0:
-            prev_entry = doc_order[position - 1]
-            prev_id = f"{book_id}/{prev_entry[4]}/{prev_entry[5]}"
-
-        if position < len(doc_order) - 1:
-            next_entry = doc_order[position + 1]
-            next_id = f"{book_id}/{next_entry[4]}/{next_entry[5]}"
-
-        return prev_id, next_id
-
-    # Create position lookup
-    position_lookup = {}
-    for i, entry in enumerate(doc_order):
-        chapter_num, section_num, subsection_num = entry[0], entry[1], entry[2]
-        position_lookup[(chapter_num, section_num, subsection_num)] = i
+    # Prev/next document IDs for every doc_order key, computed in one pass
+    # (each entry's ID fills in the previous entry's "next" as it is built),
+    # and each key's entry for the titles and slugs doc_order already resolved
+    prev_next = {}
+    prev_key = prev_id = None
+    order_entries = {}
+    # doc_order is already sorted: group its numbers instead of re-sorting
+    chapter_order = []
+    section_order = {}  # chapter -> section numbers
+    subsection_order = {}  # (chapter, section) -> subsection numbers
+    for entry in doc_order:
+        key = (entry.chapter_num, entry.section_num, entry.subsection_num)
+        doc_id = f"{book_id}/{entry.dir_name}/{entry.file_name}"
+        if prev_key is not None:
+            prev_next[prev_key] = (prev_next[prev_key][0], doc_id)
+        prev_next[key] = (prev_id, None)
+        prev_key, prev_id = key, doc_id
+        order_entries[key] = entry
+        if entry.file_name == "intro":
+            chapter_order.append(entry.chapter_num)
+            section_order[entry.chapter_num] = []
+        elif entry.subsection_num is None:
+            section_order[entry.chapter_num].append(entry.section_num)
+            subsection_order[(entry.chapter_num, entry.section_num)] = []
+        else:
+            subsection_order[(entry.chapter_num, entry.section_num)].append(
+                entry.subsection_num
+            )
 
     # Set up output directories with new structure: export/{lang}/{book_id}/
     export_root = "export"
@@ -2060,352 +2767,44 @@ def build_book_json():
 
     # Clean and create output directories
     print(f"\nCleaning output directory: {json_book_dir}")
-    if os.path.exists(json_book_dir):
-        shutil.rmtree(json_book_dir)
-    os.makedirs(json_book_dir, exist_ok=True)
+    stale_dirs = [json_book_dir]
 
     # Clean pictures directory if using root location
     pictures_location = config.get("pictures_location", "root")
     if pictures_location == "root":
-        pictures_root = os.path.join(export_root, "pictures", lang, book_id)
-        if os.path.exists(pictures_root):
-            shutil.rmtree(pictures_root)
+        stale_dirs.append(os.path.join(export_root, "pictures", lang, book_id))
 
     if ENABLE_MARKDOWN:
         md_lang_dir = os.path.join(MARKDOWN_DIR, lang)
         print(f"Cleaning markdown directory: {md_lang_dir}")
-        if os.path.exists(md_lang_dir):
-            shutil.rmtree(md_lang_dir)
-        os.makedirs(md_lang_dir, exist_ok=True)
+        stale_dirs.append(md_lang_dir)
 
-    # Track images for markdown and image manifest
-    image_paths = {}
-    image_manifest = []  # For image_manifest.json (used by process_images.py)
+    remove_trees(stale_dirs)
+    os.makedirs(json_book_dir, exist_ok=True)
+    if ENABLE_MARKDOWN:
+        os.makedirs(md_lang_dir, exist_ok=True)
 
     # Process each chapter
     print("\nProcessing chapters...")
-    for chapter_num in sorted(chapters.keys()):
-        # Get chapter title and create slugified directory name
-        chapter_key = (chapter_num, "chapter")
-        chapter_title = title_map.get(chapter_key, f"Chapter {chapter_num}")
-        chapter_slug = slugify(chapter_title)
-        chapter_dir_name = f"{chapter_num:02d}"
-
-        print(f"\n  Chapter {chapter_num} ({chapter_dir_name}):")
-
-        chapter_dir = os.path.join(json_book_dir, chapter_dir_name)
-        os.makedirs(chapter_dir, exist_ok=True)
-
-        md_chapter_dir = None
-        if ENABLE_MARKDOWN:
-            md_chapter_dir = os.path.join(md_lang_dir, f"{chapter_num:02d}")
-            os.makedirs(md_chapter_dir, exist_ok=True)
-
-        chapter_data = chapters[chapter_num]
-
-        # Build intro section (chapter-level elements)
-        intro_content = []
-        # Section path for intro: NN/intro
-        intro_section_path = f"{chapter_num:02d}/intro"
-
-        if chapter_num in chapter_elements:
-            for elem_type, elem in chapter_elements[chapter_num]:
-                if elem_type == "paragraph":
-                    intro_content.append(extract_paragraph_json(elem))
-                elif elem_type == "table":
-                    intro_content.append(extract_table_json(elem))
-                elif elem_type == "table_cell":
-                    intro_content.append(extract_table_cell_json(elem))
-                elif elem_type == "image":
-                    # elem is a tuple: (image_part, image_index, alt, caption, rId, content_type)
-                    if isinstance(elem, tuple) and len(elem) >= 2:
-                        img_idx = elem[1]
-                        alt_text = elem[2] if len(elem) > 2 else ""
-                        caption_text = elem[3] if len(elem) > 3 else ""
-                        r_id = elem[4] if len(elem) > 4 else ""
-                        content_type = elem[5] if len(elem) > 5 else ""
-
-                        # Compute deterministic image path (no file I/O)
-                        image_filename = f"{img_idx:03d}.png"
-                        image_rel_path = (
-                            f"pictures/{intro_section_path}/{image_filename}"
-                        )
-                        intro_content.append(
-                            extract_image_json(image_rel_path, alt_text, caption_text)
-                        )
-
-                        # Add to image manifest for process_images.py
-                        image_manifest.append(
-                            {
-                                "image_index": img_idx,
-                                "rId": r_id,
-                                "content_type": content_type,
-                                "section_path": intro_section_path,
-                                "filename": image_filename,
-                                "alt": alt_text,
-                                "caption": caption_text,
-                                "chapter_dir": f"{chapter_num:02d}",
-                            }
-                        )
-
-                        # Track markdown image path
-                        if ENABLE_MARKDOWN:
-                            md_img_path = f"pictures/{image_filename}"
-                            if (chapter_num, None, None) not in image_paths:
-                                image_paths[(chapter_num, None, None)] = []
-                            image_paths[(chapter_num, None, None)].append(md_img_path)
-
-        # Save intro with md2rag metadata
-        if intro_content:
-            intro_file_name = "intro"
-            position = position_lookup.get((chapter_num, 0, None), 0)
-            prev_id, next_id = get_prev_next_ids(position)
-            # Human-readable section_id
-            section_id = build_section_id(chapter_slug)
-
-            intro_json = build_section_json(
-                intro_content,
-                book_id,
-                chapter_dir_name,
-                intro_file_name,
-                chapter_title,
-                section_id,
-                prev_id,
-                next_id,
-            )
-
-            intro_file = os.path.join(chapter_dir, f"{intro_file_name}.json")
-            with open(intro_file, "w", encoding="utf-8") as f:
-                json.dump(intro_json, f, indent=2)
-            print(f"    ✓ {intro_file_name}.json ({len(intro_content)} items)")
-
-            if ENABLE_MARKDOWN and md_chapter_dir and chapter_num in chapter_elements:
-                md_file = os.path.join(md_chapter_dir, "intro.md")
-                md_content = list(chapter_elements[chapter_num])
-                key = (chapter_num, None, None)
-                if key in image_paths:
-                    for img_path in image_paths[key]:
-                        md_content.append(("image", img_path))
-                save_markdown_file(md_file, md_content, chapter_num)
-                print("    ✓ intro.md")
-
-        # Process sections
-        for section_num in sorted(chapter_data["sections"].keys()):
-            section_data = chapter_data["sections"][section_num]
-
-            # Get section title and create slugified file name
-            section_key = (chapter_num, section_num)
-            section_title = title_map.get(section_key, f"{chapter_num}.{section_num}")
-            section_slug = slugify(section_title)
-            section_file_name = f"{section_num:02d}"
-            # Section path for pictures: NN/SS
-            section_path = f"{chapter_num:02d}/{section_num:02d}"
-
-            # Build section content
-            section_content = []
-
-            key = (chapter_num, section_num)
-            if key in section_elements:
-                for elem_type, elem in section_elements[key]:
-                    if elem_type == "paragraph":
-                        section_content.append(extract_paragraph_json(elem))
-                    elif elem_type == "table":
-                        section_content.append(extract_table_json(elem))
-                    elif elem_type == "table_cell":
-                        section_content.append(extract_table_cell_json(elem))
-                    elif elem_type == "image":
-                        if isinstance(elem, tuple) and len(elem) >= 2:
-                            img_idx = elem[1]
-                            alt_text = elem[2] if len(elem) > 2 else ""
-                            caption_text = elem[3] if len(elem) > 3 else ""
-                            r_id = elem[4] if len(elem) > 4 else ""
-                            content_type = elem[5] if len(elem) > 5 else ""
-
-                            image_filename = f"{img_idx:03d}.png"
-                            image_rel_path = f"pictures/{section_path}/{image_filename}"
-                            section_content.append(
-                                extract_image_json(
-                                    image_rel_path, alt_text, caption_text
-                                )
-                            )
-
-                            image_manifest.append(
-                                {
-                                    "image_index": img_idx,
-                                    "rId": r_id,
-                                    "content_type": content_type,
-                                    "section_path": section_path,
-                                    "filename": image_filename,
-                                    "alt": alt_text,
-                                    "caption": caption_text,
-                                    "chapter_dir": f"{chapter_num:02d}",
-                                }
-                            )
-
-                            if ENABLE_MARKDOWN:
-                                md_img_path = f"pictures/{image_filename}"
-                                md_key = (chapter_num, section_num, None)
-                                if md_key not in image_paths:
-                                    image_paths[md_key] = []
-                                image_paths[md_key].append(md_img_path)
-
-            # Save section with md2rag metadata
-            position = position_lookup.get((chapter_num, section_num, None), 0)
-            prev_id, next_id = get_prev_next_ids(position)
-            # Human-readable section_id
-            section_id = build_section_id(chapter_slug, section_slug)
-
-            section_json = build_section_json(
-                section_content,
-                book_id,
-                chapter_dir_name,
-                section_file_name,
-                section_title,
-                section_id,
-                prev_id,
-                next_id,
-            )
-
-            section_file = os.path.join(chapter_dir, f"{section_file_name}.json")
-            with open(section_file, "w", encoding="utf-8") as f:
-                json.dump(section_json, f, indent=2)
-            print(f"    ✓ {section_file_name}.json ({len(section_content)} items)")
-
-            if ENABLE_MARKDOWN and md_chapter_dir:
-                key = (chapter_num, section_num)
-                if key in section_elements:
-                    md_file = os.path.join(
-                        md_chapter_dir, f"{section_num:02d}.md"
-                    )
-                    md_content = list(section_elements[key])
-                    img_key = (chapter_num, section_num, None)
-                    if img_key in image_paths:
-                        for img_path in image_paths[img_key]:
-                            md_content.append(("image", img_path))
-                    save_markdown_file(md_file, md_content, chapter_num, section_num)
-                    print(f"    ✓ {section_num:02d}.md")
-
-            # Process subsections
-            if section_data["subsections"]:
-                for subsection_num in sorted(section_data["subsections"].keys()):
-                    # Get subsection title and create slugified file name
-                    subsection_key = (chapter_num, section_num, subsection_num)
-                    subsection_title = title_map.get(
-                        subsection_key,
-                        f"{chapter_num}.{section_num}.{subsection_num}",
-                    )
-                    subsection_slug = slugify(subsection_title)
-                    subsection_file_name = (
-                        f"{section_num:02d}_{subsection_num:02d}"
-                    )
-                    # Section path for pictures: NN/SS_SS
-                    subsection_path = f"{chapter_num:02d}/{section_num:02d}_{subsection_num:02d}"
-
-                    subsection_content = []
-
-                    key = (chapter_num, section_num, subsection_num)
-                    if key in subsection_elements:
-                        for elem_type, elem in subsection_elements[key]:
-                            if elem_type == "paragraph":
-                                subsection_content.append(extract_paragraph_json(elem))
-                            elif elem_type == "table":
-                                subsection_content.append(extract_table_json(elem))
-                            elif elem_type == "table_cell":
-                                subsection_content.append(extract_table_cell_json(elem))
-                            elif elem_type == "image":
-                                if isinstance(elem, tuple) and len(elem) >= 2:
-                                    img_idx = elem[1]
-                                    alt_text = elem[2] if len(elem) > 2 else ""
-                                    caption_text = elem[3] if len(elem) > 3 else ""
-                                    r_id = elem[4] if len(elem) > 4 else ""
-                                    content_type = elem[5] if len(elem) > 5 else ""
-
-                                    image_filename = f"{img_idx:03d}.png"
-                                    image_rel_path = (
-                                        f"pictures/{subsection_path}/{image_filename}"
-                                    )
-                                    subsection_content.append(
-                                        extract_image_json(
-                                            image_rel_path, alt_text, caption_text
-                                        )
-                                    )
-
-                                    image_manifest.append(
-                                        {
-                                            "image_index": img_idx,
-                                            "rId": r_id,
-                                            "content_type": content_type,
-                                            "section_path": subsection_path,
-                                            "filename": image_filename,
-                                            "alt": alt_text,
-                                            "caption": caption_text,
-                                            "chapter_dir": f"{chapter_num:02d}",
-                                        }
-                                    )
-
-                                    if ENABLE_MARKDOWN:
-                                        md_img_path = f"pictures/{image_filename}"
-                                        md_key = (
-                                            chapter_num,
-                                            section_num,
-                                            subsection_num,
-                                        )
-                                        if md_key not in image_paths:
-                                            image_paths[md_key] = []
-                                        image_paths[md_key].append(md_img_path)
-
-                    # Save subsection with md2rag metadata
-                    position = position_lookup.get(
-                        (chapter_num, section_num, subsection_num), 0
-                    )
-                    prev_id, next_id = get_prev_next_ids(position)
-                    # Human-readable section_id
-                    sub_section_id = build_section_id(
-                        chapter_slug, section_slug, subsection_slug
-                    )
-
-                    subsection_json = build_section_json(
-                        subsection_content,
-                        book_id,
-                        chapter_dir_name,
-                        subsection_file_name,
-                        subsection_title,
-                        sub_section_id,
-                        prev_id,
-                        next_id,
-                    )
-
-                    subsection_file = os.path.join(
-                        chapter_dir, f"{subsection_file_name}.json"
-                    )
-                    with open(subsection_file, "w", encoding="utf-8") as f:
-                        json.dump(subsection_json, f, indent=2)
-                    print(
-                        f"      ✓ {subsection_file_name}.json ({len(subsection_content)} items)"
-                    )
+    job = {
+        "chapters": chapters,
+        "chapter_elements": chapter_elements,
+        "section_elements": section_elements,
+        "subsection_elements": subsection_elements,
+        "prev_next": prev_next,
+        "order_entries": order_entries,
+        "section_order": section_order,
+        "subsection_order": subsection_order,
+        "book_id": book_id,
+        "json_book_dir": json_book_dir,
+        "md_lang_dir": md_lang_dir if ENABLE_MARKDOWN else None,
+    }
 
-                    if ENABLE_MARKDOWN and md_chapter_dir:
-                        key = (chapter_num, section_num, subsection_num)
-                        if key in subsection_elements:
-                            md_file = os.path.join(
-                                md_chapter_dir,
-                                f"{section_num:02d}_{subsection_num:02d}.md",
-                            )
-                            md_content = list(subsection_elements[key])
-                            img_key = (chapter_num, section_num, subsection_num)
-                            if img_key in image_paths:
-                                for img_path in image_paths[img_key]:
-                                    md_content.append(("image", img_path))
-                            save_markdown_file(
-                                md_file,
-                                md_content,
-                                chapter_num,
-                                section_num,
-                                subsection_num,
-                            )
-                            print(
-                                f"      ✓ {section_num:02d}_{subsection_num:02d}.md"
-                            )
+    image_manifest = []  # For image_manifest.json (used by process_images.py)
+    for chapter_manifest, chapter_log in write_chapters(job, chapter_order):
+        # One write per chapter instead of a print per file
+        sys.stdout.write("\n".join(chapter_log) + "\n")
+        image_manifest.extend(chapter_manifest)
 
     # Create markdown index and CSS
     if ENABLE_MARKDOWN:
@@ -2418,8 +2817,7 @@ def build_book_json():
     # Write image_manifest.json for process_images.py
     if image_manifest:
         manifest_path = os.path.join(json_book_dir, "image_manifest.json")
-        with open(manifest_path, "w", encoding="utf-8") as f:
-            json.dump({"images": image_manifest}, f, indent=2)
+        write_json(manifest_path, {"images": image_manifest})
         print(f"\n✓ Image manifest: {manifest_path} ({len(image_manifest)} images)")
 
     print("\n" + "=" * 80)
@@ -2449,8 +2847,7 @@ def build_book_json():
         "image_validation": validation,
     }
     postprocess_path = os.path.join(json_book_dir, "postprocess.json")
-    with open(postprocess_path, "w", encoding="utf-8") as f:
-        json.dump(postprocess, f, indent=2)
+    write_json(postprocess_path, postprocess)
     print(f"\n✓ Postprocess data: {postprocess_path}")
 
 
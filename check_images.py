@@ -10,6 +10,7 @@ This script:
 """
 
 import json
+import os
 from pathlib import Path
 
 
@@ -68,6 +69,9 @@ def check_images(export_dir="export"):
 
             print(f"Scanning {lang_dir.name}/{book_dir.name}...")
 
+            # Same for every reference in this book
+            book_pictures_path = pictures_path / lang_dir.name / book_dir.name
+
             # Scan JSON files for image references
             for json_file in book_dir.rglob("*.json"):
                 if json_file.name in ["index.json", "manifest.json"]:
@@ -106,9 +110,7 @@ def check_images(export_dir="export"):
                         # Actual location: export/pictures/{lang}/{book_id}/{section_path}/{filename}
                         if img_path_rel.startswith("pictures/"):
                             rel_path = img_path_rel[9:]  # Remove "pictures/" prefix
-                            img_path = (
-                                pictures_path / lang_dir.name / book_dir.name / rel_path
-                            )
+                            img_path = book_pictures_path / rel_path
                         else:
                             img_path = json_file.parent / img_path_rel
 
@@ -133,22 +135,21 @@ def check_images(export_dir="export"):
                             if expected_ext == "JPG":
                                 expected_ext = "JPEG"
 
+                            img_rel = str(img_path.relative_to(export_path))
                             if actual_format != expected_ext and actual_format not in [
                                 "ERROR",
                                 "UNKNOWN",
                             ]:
                                 stats["format_mismatches"].append(
                                     {
-                                        "file": str(img_path.relative_to(export_path)),
+                                        "file": img_rel,
                                         "expected": expected_ext,
                                         "actual": actual_format,
                                     }
                                 )
 
                             if actual_format == "WMF":
-                                stats["wmf_files"].append(
-                                    str(img_path.relative_to(export_path))
-                                )
+                                stats["wmf_files"].append(img_rel)
 
                 except Exception as e:
                     print(f"  ⚠️  Error reading {json_file.name}: {e}")
@@ -160,13 +161,13 @@ def check_images(export_dir="export"):
     # Scan actual image files on disk
     print("Scanning image files on disk...")
     if pictures_path.exists():
-        for img_file in pictures_path.rglob("*"):
-            if img_file.is_file() and img_file.suffix.lower() in [
-                ".png",
-                ".jpg",
-                ".jpeg",
-            ]:
-                stats["images_on_disk"].add(str(img_file.relative_to(export_path)))
+        # os.walk lists file names from each directory read, so there is no
+        # Path object or stat per file as with rglob("*") + is_file()
+        prefix_len = len(os.fspath(export_path)) + 1
+        for root, _dirs, files in os.walk(pictures_path):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in (".png", ".jpg", ".jpeg"):
+                    stats["images_on_disk"].add(os.path.join(root, name)[prefix_len:])
 
     print(f"✓ Found {len(stats['images_on_disk'])} image files on disk")
     print()
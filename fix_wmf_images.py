@@ -11,145 +11,79 @@ This script:
 import os
 import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 
+import image_utils
+from image_utils import find_magick, find_soffice, is_png_file, postprocess_image
 
-def postprocess_image(image_path, max_size=1200, border=10, white_threshold=240):
-    """Auto-crop whitespace and limit resolution of an image."""
-    try:
-        from PIL import Image, ImageChops
-    except ImportError:
-        return
-
-    try:
-        img = Image.open(image_path)
-    except Exception:
-        return
 
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
+# LibreOffice converts WMFs in groups of this size, each with a capped
+# timeout, so a hung file only stalls its own group and progress is printed
+# after every group
+_SOFFICE_BATCH_SIZE = 10
+_SOFFICE_BATCH_TIMEOUT = 120
 
-    bg = Image.new(img.mode, img.size, tuple([white_threshold] * len(img.getbands())))
-    diff = ImageChops.subtract(bg, img)
-    bbox = diff.getbbox()
-    if bbox:
-        left, top, right, bottom = bbox
-        left = max(0, left - border)
-        top = max(0, top - border)
-        right = min(img.width, right + border)
-        bottom = min(img.height, bottom + border)
-        img = img.crop((left, top, right, bottom))
-
-    if max_size > 0:
-        longest = max(img.width, img.height)
-        if longest > max_size:
-            scale = max_size / longest
-            new_w = int(img.width * scale)
-            new_h = int(img.height * scale)
-            img = img.resize((new_w, new_h), Image.LANCZOS)
-
-    img.save(image_path)
+# pdf_path for convert_wmf_to_png when convert_wmf_batch already ran for the
+# file and produced no PDF: go straight to ImageMagick
+_NO_PDF = object()
 
 
 def is_wmf_image(image_path):
     """Check if image file is WMF format by checking magic bytes."""
     try:
         with open(image_path, "rb") as f:
-            magic = f.read(4)
-            return magic == b"\xd7\xcd\xc6\x9a" or magic == b"\x01\x00\x09\x00"
+            return image_utils.is_wmf_image(f.read(4))
     except Exception:
         return False
 
 
-def convert_wmf_to_png(wmf_path, output_path):
-    """Convert WMF to PNG using LibreOffice + ImageMagick chain."""
-    import tempfile
-
-    # Try LibreOffice first (best for WMF)
-    soffice = shutil.which("soffice") or shutil.which("libreoffice")
-    if soffice:
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                # Convert WMF to PDF using LibreOffice
-                pdf_path = os.path.join(tmpdir, "output.pdf")
-                result = subprocess.run(
-                    [
-                        soffice,
-                        "--headless",
-                        "--convert-to",
-                        "pdf",
-                        "--outdir",
-                        tmpdir,
-                        wmf_path,
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
+def _magick_command(*args):
+    """Return an ImageMagick command line for args, or None if not installed."""
+    magick = find_magick()
+    return [magick, *args] if magick else None
+
+
+def _pdf_to_png(pdf_path, output_path):
+    """Rasterize a LibreOffice PDF to PNG with ImageMagick.
+
+    Returns True/False when ImageMagick ran and produced output, or None
+    when the caller should fall back to converting the WMF directly.
+    """
+    # Use -trim to extract just the vector content (not the full page)
+    magick_cmd = _magick_command(
+        "-density",
+        "150",
+        pdf_path,
+        "-flatten",
+        "-trim",
+        "+repage",
+        "png:" + output_path,
+    )
+    if not magick_cmd:
+        return None
+
+    result = subprocess.run(
+        magick_cmd,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+    if result.returncode == 0 and os.path.exists(output_path):
+        # Verify it's actually a PNG
+        if is_png_file(output_path):
+            return True
+        print(f"    ⚠️  Output is not PNG format")
+        return False
+    return None
 
-                # Find the generated PDF (LibreOffice might name it differently)
-                pdf_files = list(Path(tmpdir).glob("*.pdf"))
-                if pdf_files:
-                    pdf_path = str(pdf_files[0])
-
-                    # Convert PDF to PNG using ImageMagick
-                    # Use -trim to extract just the vector content (not the full page)
-                    magick_cmd = None
-                    if shutil.which("magick"):
-                        magick_cmd = [
-                            "magick",
-                            "-density",
-                            "150",
-                            pdf_path,
-                            "-flatten",
-                            "-trim",
-                            "+repage",
-                            "png:" + output_path,
-                        ]
-                    elif shutil.which("convert"):
-                        magick_cmd = [
-                            "convert",
-                            "-density",
-                            "150",
-                            pdf_path,
-                            "-flatten",
-                            "-trim",
-                            "+repage",
-                            "png:" + output_path,
-                        ]
-
-                    if magick_cmd:
-                        result = subprocess.run(
-                            magick_cmd,
-                            capture_output=True,
-                            text=True,
-                            timeout=30,
-                        )
-
-                        if result.returncode == 0 and os.path.exists(output_path):
-                            # Verify it's actually a PNG
-                            with open(output_path, "rb") as f:
-                                header = f.read(8)
-                                if header[:4] == b"\x89PNG":
-                                    return True
-                                else:
-                                    print(f"    ⚠️  Output is not PNG format")
-                                    return False
-
-        except subprocess.TimeoutExpired:
-            print(f"    ⚠️  Conversion timeout")
-            return False
-        except Exception as e:
-            print(f"    ⚠️  LibreOffice conversion error: {e}")
 
-    # Fallback: Try ImageMagick directly (needs WMF delegates)
+def _magick_wmf_to_png(wmf_path, output_path):
+    """Convert WMF to PNG with ImageMagick alone (needs WMF delegates)."""
     try:
-        magick_cmd = None
-        if shutil.which("magick"):
-            magick_cmd = ["magick", wmf_path, "png:" + output_path]
-        elif shutil.which("convert"):
-            magick_cmd = ["convert", wmf_path, "png:" + output_path]
-        else:
+        magick_cmd = _magick_command(wmf_path, "png:" + output_path)
+        if not magick_cmd:
             print("    ⚠️  No conversion tools found")
             return False
 
@@ -162,13 +96,10 @@ def convert_wmf_to_png(wmf_path, output_path):
 
         if result.returncode == 0 and os.path.exists(output_path):
             # Verify it's actually a PNG
-            with open(output_path, "rb") as f:
-                header = f.read(8)
-                if header[:4] == b"\x89PNG":
-                    return True
-                else:
-                    print(f"    ⚠️  Output is not PNG format")
-                    return False
+            if is_png_file(output_path):
+                return True
+            print(f"    ⚠️  Output is not PNG format")
+            return False
         else:
             print(f"    ⚠️  Conversion failed: {result.stderr.strip()}")
             return False
@@ -180,6 +111,69 @@ def convert_wmf_to_png(wmf_path, output_path):
         return False
 
 
+def convert_wmf_batch(wmf_paths, outdir):
+    """Convert WMF files to PDF with a single LibreOffice run.
+
+    File stems must be unique. Returns {wmf_path: pdf_path} for the files
+    that were converted.
+    """
+    soffice = find_soffice()
+    if not soffice or not wmf_paths:
+        return {}
+
+    try:
+        subprocess.run(
+            [soffice, "--headless", "--convert-to", "pdf", "--outdir", outdir]
+            + list(wmf_paths),
+            capture_output=True,
+            text=True,
+            timeout=min(30 * len(wmf_paths), _SOFFICE_BATCH_TIMEOUT),
+        )
+    except subprocess.TimeoutExpired:
+        print(f"    ⚠️  Conversion timeout")
+    except Exception as e:
+        print(f"    ⚠️  LibreOffice conversion error: {e}")
+
+    pdf_paths = {}
+    for wmf_path in wmf_paths:
+        pdf_path = os.path.join(outdir, Path(wmf_path).stem + ".pdf")
+        if os.path.exists(pdf_path):
+            pdf_paths[wmf_path] = pdf_path
+    return pdf_paths
+
+
+def convert_wmf_to_png(wmf_path, output_path, pdf_path=None):
+    """Convert WMF to PNG using LibreOffice + ImageMagick chain.
+
+    pdf_path, if given, is this file's PDF from convert_wmf_batch, or _NO_PDF
+    when the batch produced none; LibreOffice is not started again either way.
+    """
+    if pdf_path is _NO_PDF:
+        return _magick_wmf_to_png(wmf_path, output_path)
+
+    try:
+        if pdf_path is None:
+            # Try LibreOffice first (best for WMF)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                pdf_path = convert_wmf_batch([wmf_path], tmpdir).get(wmf_path)
+                if pdf_path:
+                    converted = _pdf_to_png(pdf_path, output_path)
+                    if converted is not None:
+                        return converted
+        else:
+            converted = _pdf_to_png(pdf_path, output_path)
+            if converted is not None:
+                return converted
+    except subprocess.TimeoutExpired:
+        print(f"    ⚠️  Conversion timeout")
+        return False
+    except Exception as e:
+        print(f"    ⚠️  LibreOffice conversion error: {e}")
+
+    # Fallback: Try ImageMagick directly (needs WMF delegates)
+    return _magick_wmf_to_png(wmf_path, output_path)
+
+
 def fix_wmf_images(base_dir="export/pictures"):
     """Find and convert all WMF files with PNG extensions."""
     print("=" * 80)
@@ -194,8 +188,8 @@ def fix_wmf_images(base_dir="export/pictures"):
         return
 
     # Check if conversion tools are available
-    has_soffice = shutil.which("soffice") or shutil.which("libreoffice")
-    has_magick = shutil.which("magick") or shutil.which("convert")
+    has_soffice = find_soffice()
+    has_magick = find_magick()
 
     if not has_soffice and not has_magick:
         print("❌ No conversion tools found. Please install:")
@@ -212,45 +206,63 @@ def fix_wmf_images(base_dir="export/pictures"):
     print(f"Scanning {len(png_files)} PNG files...")
     print()
 
-    wmf_count = 0
+    wmf_files = [png_path for png_path in png_files if is_wmf_image(png_path)]
+    wmf_count = len(wmf_files)
     converted_count = 0
     failed_count = 0
 
-    for png_path in png_files:
-        if is_wmf_image(png_path):
-            wmf_count += 1
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Numbered temp copies: pictures in different chapters share names,
+        # and LibreOffice names each PDF after its input file
+        wmf_temps = []
+        copy_errors = {}
+        for n, png_path in enumerate(wmf_files):
+            wmf_temp = os.path.join(tmpdir, f"{n:05d}.wmf")
+            try:
+                shutil.copyfile(png_path, wmf_temp)
+            except Exception as e:
+                copy_errors[wmf_temp] = e
+            wmf_temps.append(wmf_temp)
+
+        pdf_dir = os.path.join(tmpdir, "pdf")
+        os.mkdir(pdf_dir)
+        pdf_paths = {}
+
+        for n, (png_path, wmf_temp) in enumerate(zip(wmf_files, wmf_temps)):
+            if n % _SOFFICE_BATCH_SIZE == 0:
+                # One LibreOffice run converts the next group of WMFs to PDF
+                group = wmf_temps[n : n + _SOFFICE_BATCH_SIZE]
+                pdf_paths = convert_wmf_batch(
+                    [w for w in group if w not in copy_errors], pdf_dir
+                )
+
             print(f"Found WMF: {png_path.relative_to(base_path)}")
 
-            # Create temporary WMF file
-            wmf_temp = str(png_path) + ".wmf.tmp"
-            png_temp = str(png_path) + ".png.tmp"
+            png_file = os.fspath(png_path)
+            png_temp = png_file + ".png.tmp"
 
             try:
-                # Copy to temp WMF file
-                shutil.copy2(png_path, wmf_temp)
+                if wmf_temp in copy_errors:
+                    raise copy_errors[wmf_temp]
 
                 # Convert to PNG
-                if convert_wmf_to_png(wmf_temp, png_temp):
-                    # Backup original WMF
-                    backup_path = str(png_path) + ".wmf.backup"
-                    shutil.move(str(png_path), backup_path)
+                pdf_path = pdf_paths.get(wmf_temp, _NO_PDF)
+                if convert_wmf_to_png(wmf_temp, png_temp, pdf_path):
+                    # Backup original WMF (renames within the same directory)
+                    backup_path = png_file + ".wmf.backup"
+                    os.replace(png_file, backup_path)
 
                     # Move converted PNG to final location
-                    shutil.move(png_temp, str(png_path))
+                    os.replace(png_temp, png_file)
 
                     # Post-process: auto-crop whitespace and limit resolution
-                    postprocess_image(str(png_path))
-
-                    # Clean up temp WMF
-                    os.remove(wmf_temp)
+                    postprocess_image(png_file)
 
                     print(f"  ✓ Converted and post-processed successfully")
                     print(f"  ✓ Original backed up to: {Path(backup_path).name}")
                     converted_count += 1
                 else:
                     # Clean up temp files
-                    if os.path.exists(wmf_temp):
-                        os.remove(wmf_temp)
                     if os.path.exists(png_temp):
                         os.remove(png_temp)
                     failed_count += 1
@@ -258,8 +270,6 @@ def fix_wmf_images(base_dir="export/pictures"):
             except Exception as e:
                 print(f"  ❌ Error: {e}")
                 # Clean up temp files
-                if os.path.exists(wmf_temp):
-                    os.remove(wmf_temp)
                 if os.path.exists(png_temp):
                     os.remove(png_temp)
                 failed_count += 1
@@ -0,0 +1,113 @@
+"""
+Image helpers shared by process_images.py and fix_wmf_images.py.
+
+Only needs the standard library and Pillow (NumPy optional), so the WMF
+fixer can use them without loading python-docx.
+"""
+
+import shutil
+from functools import lru_cache
+
+
+# Placeable WMF header and standard WMF header
+_WMF_MAGICS = (b"\xd7\xcd\xc6\x9a", b"\x01\x00\x09\x00")
+
+
+def is_wmf_image(image_data):
+    """Check if image data is WMF format by checking magic bytes."""
+    return image_data.startswith(_WMF_MAGICS)
+
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def is_png_file(path):
+    """Check if the file at path starts with the PNG signature."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(8) == _PNG_MAGIC
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=1)
+def find_soffice():
+    """Return the LibreOffice executable, or None. PATH is searched once per run."""
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+@lru_cache(maxsize=1)
+def find_magick():
+    """Return the ImageMagick command ("magick", or legacy "convert"), or None.
+
+    Like find_soffice, resolved once per run.
+    """
+    for cmd in ("magick", "convert"):
+        if shutil.which(cmd):
+            return cmd
+    return None
+
+
+def _content_bbox(img, white_threshold):
+    """Return the bounding box of pixels darker than white_threshold, or None.
+
+    Uses NumPy row/column reductions when NumPy is installed; otherwise
+    falls back to Pillow's subtract-from-background + getbbox.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        from PIL import Image, ImageChops
+
+        bg = Image.new(
+            img.mode, img.size, tuple([white_threshold] * len(img.getbands()))
+        )
+        return ImageChops.subtract(bg, img).getbbox()
+
+    mask = np.asarray(img) < white_threshold
+    if mask.ndim == 3:
+        mask = mask.any(axis=2)
+    rows = mask.any(axis=1)
+    if not rows.any():
+        return None
+    cols = mask.any(axis=0)
+    top = int(rows.argmax())
+    bottom = len(rows) - int(rows[::-1].argmax())
+    left = int(cols.argmax())
+    right = len(cols) - int(cols[::-1].argmax())
+    return (left, top, right, bottom)
+
+
+def postprocess_image(image_path, max_size=1200, border=10, white_threshold=240):
+    """Auto-crop whitespace and limit resolution of an image."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+
+    try:
+        img = Image.open(image_path)
+    except Exception:
+        return
+
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    bbox = _content_bbox(img, white_threshold)
+    if bbox:
+        left, top, right, bottom = bbox
+        left = max(0, left - border)
+        top = max(0, top - border)
+        right = min(img.width, right + border)
+        bottom = min(img.height, bottom + border)
+        img = img.crop((left, top, right, bottom))
+
+    if max_size > 0:
+        longest = max(img.width, img.height)
+        if longest > max_size:
+            scale = max_size / longest
+            new_w = int(img.width * scale)
+            new_h = int(img.height * scale)
+            img = img.resize((new_w, new_h), Image.LANCZOS)
+
+    img.save(image_path)
@@ -11,33 +11,62 @@ Usage:
     python3 process_images.py
 """
 
+import hashlib
+import io
 import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-from build_book import load_book_config, resolve_paths_from_config
+from build_book import (
+    decode_json,
+    ensure_dir,
+    load_book_config,
+    open_document,
+    read_json,
+    resolve_paths_from_config,
+    write_bytes,
+    write_json,
+)
+from image_utils import (
+    find_magick,
+    find_soffice,
+    is_png_file,
+    is_wmf_image,
+    postprocess_image,
+)
+
 EXPORT_DIR = "export"
 MARKDOWN_DIR = "export_md"
 
 
-def is_wmf_image(image_data):
-    """Check if image data is WMF format by checking magic bytes."""
-    if len(image_data) < 4:
-        return False
-    magic = image_data[:4]
-    return magic == b"\xd7\xcd\xc6\x9a" or magic == b"\x01\x00\x09\x00"
+@lru_cache(maxsize=None)
+def content_type_kind(content_type):
+    """Classify a manifest content type as "wmf", "png" or "other", ignoring case."""
+    lowered = content_type.lower()
+    if "wmf" in lowered:
+        return "wmf"
+    if "png" in lowered:
+        return "png"
+    return "other"
+
+
+# LibreOffice refuses to run two headless instances on one user profile
+_soffice_lock = threading.Lock()
 
 
 def convert_wmf_to_png(wmf_path, output_path):
     """Convert WMF to PNG using LibreOffice -> PDF -> ImageMagick chain."""
-    soffice = shutil.which("soffice") or shutil.which("libreoffice")
+    soffice = find_soffice()
     if soffice:
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
+            with tempfile.TemporaryDirectory() as tmpdir, _soffice_lock:
                 result = subprocess.run(
                     [
                         soffice,
@@ -55,44 +84,27 @@ def convert_wmf_to_png(wmf_path, output_path):
 
                 pdf_files = list(Path(tmpdir).glob("*.pdf"))
                 if pdf_files:
-                    pdf_path = str(pdf_files[0])
-
-                    magick_cmd = None
-                    if shutil.which("magick"):
-                        magick_cmd = [
-                            "magick",
-                            "-density",
-                            "150",
-                            pdf_path,
-                            "-flatten",
-                            "-trim",
-                            "+repage",
-                            "png:" + output_path,
-                        ]
-                    elif shutil.which("convert"):
-                        magick_cmd = [
-                            "convert",
-                            "-density",
-                            "150",
-                            pdf_path,
-                            "-flatten",
-                            "-trim",
-                            "+repage",
-                            "png:" + output_path,
-                        ]
-
-                    if magick_cmd:
+                    pdf_path = os.fspath(pdf_files[0])
+
+                    magick = find_magick()
+                    if magick:
                         result = subprocess.run(
-                            magick_cmd,
+                            [
+                                magick,
+                                "-density",
+                                "150",
+                                pdf_path,
+                                "-flatten",
+                                "-trim",
+                                "+repage",
+                                "png:" + output_path,
+                            ],
                             capture_output=True,
                             text=True,
                             timeout=30,
                         )
                         if result.returncode == 0 and os.path.exists(output_path):
-                            with open(output_path, "rb") as f:
-                                if f.read(4) == b"\x89PNG":
-                                    return True
-                            return False
+                            return is_png_file(output_path)
 
         except subprocess.TimeoutExpired:
             print(f"    Warning: WMF conversion timeout")
@@ -102,21 +114,19 @@ def convert_wmf_to_png(wmf_path, output_path):
 
     # Fallback: ImageMagick directly
     try:
-        magick_cmd = None
-        if shutil.which("magick"):
-            magick_cmd = ["magick", wmf_path, "png:" + output_path]
-        elif shutil.which("convert"):
-            magick_cmd = ["convert", wmf_path, "png:" + output_path]
-        else:
+        magick = find_magick()
+        if not magick:
             print("    Warning: No conversion tools found")
             return False
 
-        result = subprocess.run(magick_cmd, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(
+            [magick, wmf_path, "png:" + output_path],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
         if result.returncode == 0 and os.path.exists(output_path):
-            with open(output_path, "rb") as f:
-                if f.read(4) == b"\x89PNG":
-                    return True
-            return False
+            return is_png_file(output_path)
         else:
             print(f"    Warning: WMF conversion failed: {result.stderr.strip()}")
             return False
@@ -128,109 +138,114 @@ def convert_wmf_to_png(wmf_path, output_path):
         return False
 
 
-def postprocess_image(image_path, max_size=1200, border=10, white_threshold=240):
-    """Auto-crop whitespace and limit resolution of an image."""
-    try:
-        from PIL import Image, ImageChops
-    except ImportError:
+def postprocess_images(image_paths):
+    """Run postprocess_image over many files using one worker per CPU."""
+    if len(image_paths) < 2:
+        for image_path in image_paths:
+            postprocess_image(image_path)
         return
 
-    try:
-        img = Image.open(image_path)
-    except Exception:
-        return
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(postprocess_image, image_paths, chunksize=8))
 
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
 
-    bg = Image.new(img.mode, img.size, tuple([white_threshold] * len(img.getbands())))
-    diff = ImageChops.subtract(bg, img)
-    bbox = diff.getbbox()
-    if bbox:
-        left, top, right, bottom = bbox
-        left = max(0, left - border)
-        top = max(0, top - border)
-        right = min(img.width, right + border)
-        bottom = min(img.height, bottom + border)
-        img = img.crop((left, top, right, bottom))
+def copy_duplicate_image(output_path, source_path):
+    """Copy a finished image (and any WMF backup) to another output path."""
+    ensure_dir(os.path.dirname(output_path))
+    shutil.copyfile(source_path, output_path)
+    backup_path = source_path + ".wmf.backup"
+    if os.path.exists(backup_path):
+        shutil.copyfile(backup_path, output_path + ".wmf.backup")
 
-    if max_size > 0:
-        longest = max(img.width, img.height)
-        if longest > max_size:
-            scale = max_size / longest
-            new_w = int(img.width * scale)
-            new_h = int(img.height * scale)
-            img = img.resize((new_w, new_h), Image.LANCZOS)
 
-    img.save(image_path)
-
-
-def extract_and_save_image(image_data, content_type, output_path):
+def extract_and_save_image(
+    image_data, content_type, output_path, postprocess_queue=None
+):
     """Save image data to output_path, converting format as needed.
 
-    Handles WMF conversion and non-PNG to PNG conversion.
+    Handles WMF conversion and non-PNG to PNG conversion. Post-processing
+    runs inline unless postprocess_queue is given, in which case the path
+    is appended to it for a later postprocess_images() batch.
     Returns True on success.
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    ensure_dir(os.path.dirname(output_path))
 
+    kind = content_type_kind(content_type)
     wmf_failed = False
-    if is_wmf_image(image_data) or "wmf" in content_type.lower():
+    if is_wmf_image(image_data) or kind == "wmf":
         wmf_path = output_path + ".wmf.tmp"
-        with open(wmf_path, "wb") as f:
-            f.write(image_data)
+        write_bytes(wmf_path, image_data)
 
         if convert_wmf_to_png(wmf_path, output_path):
             backup_path = output_path + ".wmf.backup"
-            os.rename(wmf_path, backup_path)
+            os.replace(wmf_path, backup_path)
         else:
-            # Conversion failed, save raw data
-            os.remove(wmf_path)
-            with open(output_path, "wb") as f:
-                f.write(image_data)
+            # Conversion failed, keep raw data (the temp file already holds it)
+            os.replace(wmf_path, output_path)
             wmf_failed = True
     else:
-        with open(output_path, "wb") as f:
-            f.write(image_data)
-
-        # Try to convert non-PNG to PNG, or verify PNG is valid
+        # Convert non-PNG to PNG, or verify PNG is valid, before touching disk
         try:
             from PIL import Image
 
-            img = Image.open(output_path)
+            img = Image.open(io.BytesIO(image_data))
             img.load()
-            if "png" not in content_type:
+            if kind != "png":
                 img.save(output_path, "PNG")
+            else:
+                write_bytes(output_path, image_data)
         except (ImportError, Exception):
             # PIL can't handle this file (SVG, OLE, EMF, etc.)
             # Try LibreOffice conversion chain as fallback
+            if os.path.exists(output_path):
+                os.remove(output_path)
             tmp_src = output_path + ".src.tmp"
-            os.rename(output_path, tmp_src)
+            write_bytes(tmp_src, image_data)
             if convert_wmf_to_png(tmp_src, output_path):
                 os.remove(tmp_src)
             else:
-                # Conversion failed, restore raw bytes
-                os.rename(tmp_src, output_path)
+                # Conversion failed, keep raw bytes
+                os.replace(tmp_src, output_path)
                 wmf_failed = True
 
     if not wmf_failed:
-        postprocess_image(output_path)
+        if postprocess_queue is None:
+            postprocess_image(output_path)
+        else:
+            postprocess_queue.append(output_path)
     return True
 
 
+def _json_image_refs(json_path):
+    """Return the image paths referenced by one content JSON file."""
+    with open(json_path, "rb") as f:
+        payload = f.read()
+    # An image item needs the literal "image"; most section files have none
+    # and are skipped without decoding their text and runs
+    if b'"image"' not in payload:
+        return []
+
+    refs = []
+    try:
+        data = decode_json(payload)
+        for item in data.get("content", []):
+            if item.get("type") == "image" and item.get("path"):
+                refs.append(item["path"])
+    except (json.JSONDecodeError, KeyError):
+        pass
+    return refs
+
+
 def validate_images(json_dir, images_dir):
     """Validate image references in JSON against files on disk."""
     import glob as glob_mod
 
+    # Files are read on threads so their I/O overlaps
+    json_files = glob_mod.glob(f"{json_dir}/**/*.json", recursive=True)
     json_refs = set()
-    for jf in glob_mod.glob(f"{json_dir}/**/*.json", recursive=True):
-        try:
-            with open(jf, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            for item in data.get("content", []):
-                if item.get("type") == "image" and item.get("path"):
-                    json_refs.add(item["path"])
-        except (json.JSONDecodeError, KeyError):
-            continue
+    with ThreadPoolExecutor(max_workers=8) as read_pool:
+        for refs in read_pool.map(_json_image_refs, json_files):
+            json_refs.update(refs)
 
     disk_files = set()
     for root, dirs, files in os.walk(images_dir):
@@ -293,8 +308,7 @@ def process_images():
         print(f"Error: {manifest_path} not found. Run 'make build' first.")
         sys.exit(1)
 
-    with open(manifest_path, "r", encoding="utf-8") as f:
-        manifest = json.load(f)
+    manifest = read_json(manifest_path)
 
     images = manifest.get("images", [])
     if not images:
@@ -308,10 +322,8 @@ def process_images():
         print(f"Error: {input_docx} not found.")
         sys.exit(1)
 
-    from docx import Document
-
     print(f"Opening {input_docx}...")
-    doc = Document(input_docx)
+    doc = open_document(input_docx)
 
     # Build rId -> image_part lookup
     related_parts = doc.part.related_parts
@@ -320,6 +332,32 @@ def process_images():
     skipped = 0
     failed = 0
 
+    # Extraction runs on I/O threads (PIL and subprocess release the GIL);
+    # crop/resize and markdown copies run after it, in parallel
+    io_pool = ThreadPoolExecutor(max_workers=8)
+    pending = []
+    submitted = set()
+    # Identical blobs are converted once and copied to their other paths
+    extracted = {}  # (blob digest, content_type) -> first output path
+    duplicates = {}  # output path -> output path holding the same image
+    digests = {}  # rId -> blob digest; one picture can be placed many times
+    postprocess_queue = []
+    md_copies = {}
+
+    # Output locations are fixed prefixes plus per-image parts; build the
+    # prefixes once and concatenate inside the loop
+    sep = os.sep
+    if pictures_location == "root":
+        pictures_prefix = os.path.join(EXPORT_DIR, "pictures", lang, book_id) + sep
+    elif pictures_location == "book":
+        pictures_prefix = os.path.join(EXPORT_DIR, lang, book_id, "pictures") + sep
+    else:
+        pictures_prefix = os.path.join(EXPORT_DIR, lang, book_id) + sep
+
+    # Markdown copies go under export_md/{lang}/ when that tree exists
+    md_lang_dir = os.path.join(MARKDOWN_DIR, lang)
+    md_prefix = md_lang_dir + sep if os.path.exists(md_lang_dir) else None
+
     for entry in images:
         img_idx = entry["image_index"]
         r_id = entry["rId"]
@@ -329,26 +367,16 @@ def process_images():
         chapter_dir = entry.get("chapter_dir", "")
 
         # Determine output path for JSON pictures
-        if pictures_location == "root":
-            pictures_dir = os.path.join(
-                EXPORT_DIR, "pictures", lang, book_id, section_path
-            )
-        elif pictures_location == "book":
-            pictures_dir = os.path.join(
-                EXPORT_DIR, lang, book_id, "pictures", section_path
-            )
+        if pictures_location in ("root", "book"):
+            pictures_dir = pictures_prefix + section_path
         else:
-            chapter_part = (
-                section_path.split("/")[0] if "/" in section_path else section_path
-            )
-            pictures_dir = os.path.join(
-                EXPORT_DIR, lang, book_id, chapter_part, "pictures"
-            )
+            chapter_part = section_path.split("/", 1)[0]
+            pictures_dir = f"{pictures_prefix}{chapter_part}{sep}pictures"
 
-        output_path = os.path.join(pictures_dir, filename)
+        output_path = pictures_dir + sep + filename
 
         # Skip if already exists
-        if os.path.exists(output_path):
+        if output_path in submitted or os.path.exists(output_path):
             skipped += 1
             continue
 
@@ -362,21 +390,54 @@ def process_images():
         image_data = image_part.blob
 
         # Save and process
-        extract_and_save_image(image_data, content_type, output_path)
+        digest = digests.get(r_id)
+        if digest is None:
+            digest = digests[r_id] = hashlib.blake2b(
+                image_data, digest_size=16
+            ).digest()
+        blob_key = (digest, content_type)
+        source_path = extracted.get(blob_key)
+        if source_path is None:
+            extracted[blob_key] = output_path
+            pending.append(
+                io_pool.submit(
+                    extract_and_save_image,
+                    image_data,
+                    content_type,
+                    output_path,
+                    postprocess_queue,
+                )
+            )
+        else:
+            duplicates[output_path] = source_path
+        submitted.add(output_path)
         processed += 1
 
         if processed % 50 == 0:
             print(f"  Processed {processed} images...")
 
         # Also save to markdown directory (under export_md/{lang}/)
-        md_lang_dir = os.path.join(MARKDOWN_DIR, lang)
-        if os.path.exists(md_lang_dir) and chapter_dir:
-            md_pictures_dir = os.path.join(md_lang_dir, chapter_dir, "pictures")
-            md_output_path = os.path.join(md_pictures_dir, filename)
-            if not os.path.exists(md_output_path):
-                # Copy from already-processed JSON image
-                os.makedirs(md_pictures_dir, exist_ok=True)
-                shutil.copy2(output_path, md_output_path)
+        if md_prefix is not None and chapter_dir:
+            md_pictures_dir = f"{md_prefix}{chapter_dir}{sep}pictures"
+            md_output_path = md_pictures_dir + sep + filename
+            if not os.path.exists(md_output_path) and md_output_path not in md_copies:
+                ensure_dir(md_pictures_dir)
+                md_copies[md_output_path] = output_path
+
+    for future in pending:
+        future.result()
+    io_pool.shutdown()
+
+    postprocess_images(postprocess_queue)
+
+    # The copies are independent file I/O, so they overlap on threads.
+    # Duplicates land first: markdown copies may read from them.
+    with ThreadPoolExecutor(max_workers=8) as copy_pool:
+        # Repeated images get a copy of the finished file (and any WMF backup)
+        list(copy_pool.map(copy_duplicate_image, duplicates, duplicates.values()))
+
+        # Copy from already-processed JSON images
+        list(copy_pool.map(shutil.copyfile, md_copies.values(), md_copies))
 
     print(f"\nProcessed: {processed}, Skipped (existing): {skipped}, Failed: {failed}")
 
@@ -397,8 +458,7 @@ def process_images():
             pictures_root = os.path.join(json_book_dir, "pictures")
         os.makedirs(pictures_root, exist_ok=True)
         pics_manifest_path = os.path.join(pictures_root, "manifest.json")
-        with open(pics_manifest_path, "w", encoding="utf-8") as f:
-            json.dump(manifest_data, f, indent=2)
+        write_json(pics_manifest_path, manifest_data)
         print(f"Created {pics_manifest_path}")
 
     # Validate
@@ -413,11 +473,9 @@ def process_images():
         # Update postprocess.json with validation results
         postprocess_path = os.path.join(json_book_dir, "postprocess.json")
         if os.path.exists(postprocess_path):
-            with open(postprocess_path, "r", encoding="utf-8") as f:
-                postprocess = json.load(f)
+            postprocess = read_json(postprocess_path)
             postprocess["image_validation"] = validation
-            with open(postprocess_path, "w", encoding="utf-8") as f:
-                json.dump(postprocess, f, indent=2)
+            write_json(postprocess_path, postprocess)
             print(f"Updated {postprocess_path} with validation results")
 
     print("\n" + "=" * 80)
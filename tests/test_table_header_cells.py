@@ -0,0 +1,57 @@
+"""Tests for section-header cells found in tables by get_document_elements_in_order."""
+
+from docx import Document
+
+from build_book import TableCellElem, TableElem, get_document_elements_in_order
+
+
+def table_elements(doc):
+    return [
+        elem
+        for elem in get_document_elements_in_order(doc, -1)
+        if isinstance(elem, (TableCellElem, TableElem))
+    ]
+
+
+def test_header_in_last_row_is_found():
+    doc = Document()
+    table = doc.add_table(rows=4, cols=3)
+    for row_index, row in enumerate(table.rows[:-1]):
+        for col_index, cell in enumerate(row.cells):
+            cell.text = f"value {row_index}/{col_index}"
+    table.cell(3, 1).text = "2.3 Header"
+
+    elements = table_elements(doc)
+
+    assert [(e.index, e.text) for e in elements] == [("T0R3C1E1", "2.3 Header")]
+
+
+def test_every_header_cell_is_found():
+    doc = Document()
+    table = doc.add_table(rows=6, cols=4)
+    for row_index, row in enumerate(table.rows):
+        for col_index, cell in enumerate(row.cells):
+            cell.text = f"{row_index + 1}.{col_index + 1} Entry"
+
+    elements = table_elements(doc)
+
+    assert len(elements) == 24
+    assert elements[-1].index == "T0R5C3E1"
+    assert elements[-1].text == "6.4 Entry"
+
+
+def test_merged_header_cells_are_yielded_once():
+    doc = Document()
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "1.1 Across"
+    table.cell(0, 2).merge(table.cell(2, 2)).text = "1.2 Down"
+    table.cell(2, 0).text = "1.3 First\n1.4 Second"
+
+    elements = table_elements(doc)
+
+    assert [(e.index, e.text) for e in elements] == [
+        ("T0R0C0E1", "1.1 Across"),
+        ("T0R0C2E1", "1.2 Down"),
+        ("T0R2C0E1", "1.3 First"),
+        ("T0R2C0E2", "1.4 Second"),
+    ]
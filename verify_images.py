@@ -5,6 +5,7 @@ This script checks the integrity of the book content structure.
 """
 
 import json
+import os
 from collections import defaultdict
 from pathlib import Path
 
@@ -15,8 +16,6 @@ def load_current_book_config():
     Uses LANG_CODE env var to find lang-store/<lang>/book_config.toml,
     or falls back to root book_config.toml.
     """
-    import os
-
     try:
         import tomllib
     except ImportError:
@@ -40,11 +39,24 @@ def load_current_book_config():
     return lang or config.get("language", "eng"), config.get("canonical_id")
 
 
-def verify_images():
+def iter_files(root):
+    """Yield the paths of all files under root, not following symlinked directories."""
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+
+def verify_images(referenced=None):
     """Check JSON files for image references and verify files exist.
 
     If book_config.toml is present, only verifies the configured book.
-    Otherwise falls back to checking all books.
+    Otherwise falls back to checking all books. If referenced is a set, the
+    "{lang}/{book_id}/..." picture paths seen are added to it.
     """
 
     export_path = Path("export")
@@ -77,6 +89,12 @@ def verify_images():
     for lang_dir, book_dir in books_to_check:
             print(f"\n📚 Checking: {lang_dir.name}/{book_dir.name}")
 
+            # Same for every reference in this book
+            book_pictures_path = (
+                export_path / "pictures" / lang_dir.name / book_dir.name
+            )
+            book_prefix = f"{lang_dir.name}/{book_dir.name}/"
+
             # Iterate through all chapter directories (XX format)
             for chapter_dir in sorted(book_dir.iterdir()):
                 if not chapter_dir.is_dir():
@@ -110,13 +128,9 @@ def verify_images():
                                 # Actual file location: export/pictures/{lang}/{book_id}/{section_path}/{filename}
                                 if path.startswith("pictures/"):
                                     rel_path = path[9:]  # Remove "pictures/" prefix
-                                    image_file = (
-                                        export_path
-                                        / "pictures"
-                                        / lang_dir.name
-                                        / book_dir.name
-                                        / rel_path
-                                    )
+                                    if referenced is not None:
+                                        referenced.add(book_prefix + rel_path)
+                                    image_file = book_pictures_path / rel_path
                                 else:
                                     image_file = chapter_dir / path
 
@@ -164,8 +178,12 @@ def verify_images():
         return True
 
 
-def list_orphaned_images():
-    """Find image files that are not referenced in any JSON."""
+def list_orphaned_images(referenced=None):
+    """Find image files that are not referenced in any JSON.
+
+    referenced, if given, is the set filled by verify_images(referenced);
+    otherwise the JSON files are scanned here.
+    """
 
     export_path = Path("export")
     pictures_path = export_path / "pictures"
@@ -179,12 +197,11 @@ def list_orphaned_images():
 
     total_orphaned = 0
 
-    # Build set of all referenced images
-    referenced = set()
-
     # Determine which books to check
     lang, book_id = load_current_book_config()
-    if lang and book_id:
+    if referenced is not None:
+        books_to_check = []
+    elif lang and book_id:
         book_dir = export_path / lang / book_id
         books_to_check = [(export_path / lang, book_dir)] if book_dir.is_dir() else []
     else:
@@ -196,6 +213,10 @@ def list_orphaned_images():
                 if bd.is_dir():
                     books_to_check.append((lang_dir, bd))
 
+    # Build set of all referenced images
+    if referenced is None:
+        referenced = set()
+
     for lang_dir, book_dir in books_to_check:
         for chapter_dir in sorted(book_dir.iterdir()):
             if not chapter_dir.is_dir() or not chapter_dir.name[0].isdigit():
@@ -227,16 +248,20 @@ def list_orphaned_images():
         print("\n✅ No pictures directory to check for orphans.")
         return
 
-    # Check for orphaned files in pictures directory
-    for img_file in sorted(scan_path.rglob("*")):
-        if img_file.is_file():
-            rel_path = str(img_file.relative_to(pictures_path))
-            # Skip backup files and manifest
-            if img_file.name.endswith(".backup") or img_file.name == "manifest.json":
-                continue
-            if rel_path not in referenced:
-                print(f"   🔸 {rel_path}")
-                total_orphaned += 1
+    # Check for orphaned files in pictures directory, in path-component order
+    prefix_len = len(os.fspath(pictures_path)) + 1
+    rel_paths = sorted(
+        (path[prefix_len:] for path in iter_files(scan_path)),
+        key=lambda rel_path: rel_path.split(os.sep),
+    )
+    for rel_path in rel_paths:
+        name = os.path.basename(rel_path)
+        # Skip backup files and manifest
+        if name.endswith(".backup") or name == "manifest.json":
+            continue
+        if rel_path not in referenced:
+            print(f"   🔸 {rel_path}")
+            total_orphaned += 1
 
     if total_orphaned == 0:
         print("\n✅ No orphaned images found!")
@@ -248,8 +273,10 @@ def list_orphaned_images():
 if __name__ == "__main__":
     print("\n🔍 Starting image verification...\n")
 
-    success = verify_images()
-    list_orphaned_images()
+    # One walk over the JSON files serves both reports
+    referenced = set()
+    success = verify_images(referenced)
+    list_orphaned_images(referenced)
 
     print("\n" + "=" * 70 + "\n")
 